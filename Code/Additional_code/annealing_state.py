@@ -0,0 +1,215 @@
+"""
+This program creates a lightweight state of a smartgrid composition which
+the annealing algorithms can change and undo without copying the model
+"""
+
+from __future__ import annotations
+from Additional_code.district import CABLE_COSTS, District
+from typing import Dict, List, Optional, Tuple
+
+
+class AnnealingState:
+    """
+    Composition of houses over batteries stored in plain lists. Every move
+    is written to a move log so that it can be undone without copying.
+    """
+    def __init__(self, district: District) -> None:
+        """
+        Creates the state from the current connections of the houses.
+
+        Args:
+            district (District): district with all houses connected.
+        """
+
+        # fixed information of the houses and batteries
+        self.house_points: List[Tuple[int, int]] = list(zip(
+            district.house_x.tolist(), district.house_y.tolist()))
+        self.house_energy: List[float] = district.house_output.tolist()
+        self.battery_points: List[Tuple[int, int]] = list(zip(
+            district.battery_x.tolist(), district.battery_y.tolist()))
+        self.battery_costs: int = int(district.battery_costs.sum())
+
+        # house index -> battery index and the remaining capacity
+        self.assignment: List[int] = district.assignment.tolist()
+        self.remaining: List[float] = district.remaining.tolist()
+
+        # houses of every battery in order of connection and their position
+        self.members: List[List[int]] = [list(members) for members
+                                         in district.members]
+        self.position: List[int] = [0] * len(self.assignment)
+        for members in self.members:
+            for position, house in enumerate(members):
+                self.position[house] = position
+
+        # merged trees of the sets of houses that have been seen and the
+        # cached number of cables of every battery
+        self.cache = district.tree_cache
+        self.num_cables: List[int] = [self.count_cables(i) for i
+                                      in range(len(self.members))]
+        self.total_cables: int = sum(self.num_cables)
+
+        # undo information of all moves since the last commit
+        self.log: List[Tuple[List[Tuple[int, int, int]],
+                             Dict[int, int]]] = []
+
+    def costs(self) -> int:
+        """
+        This function calculates the total costs for the cables and batteries
+
+        Returns:
+            int: total costs
+        """
+
+        return self.total_cables * CABLE_COSTS + self.battery_costs
+
+    def count_cables(self, battery: int) -> int:
+        """
+        This function merges the paths of the houses of a battery, or takes
+        the tree from the cache if the same houses have been merged before,
+        and counts the cables
+
+        Args:
+            battery (int): index of the battery
+
+        Returns:
+            int: number of cables of the battery
+        """
+
+        return len(self.cache.merged_path(self.battery_points[battery],
+                                          self.members[battery],
+                                          self.house_points))
+
+    def fits(self, house: int, battery: int, leaving: float = 0) -> bool:
+        """
+        This function checks whether a house fits in a battery
+
+        Args:
+            house (int): index of the house
+            battery (int): index of the battery
+            leaving (float): energy that leaves the battery at the same time
+
+        Returns:
+            bool: True if the battery has enough capacity left
+        """
+
+        return self.remaining[battery] + leaving >= self.house_energy[house]
+
+    def relocate(self, house: int, battery: int,
+                 position: Optional[int] = None) -> None:
+        """
+        This function moves a house to another battery without updating
+        the number of cables
+
+        Args:
+            house (int): index of the house
+            battery (int): index of the new battery
+            position (Optional[int]): position of the house in the new
+                battery, at the end if None
+        """
+
+        old = self.assignment[house]
+
+        # remove the house by putting the last house at its position
+        members = self.members[old]
+        last = members.pop()
+        if last != house:
+            members[self.position[house]] = last
+            self.position[last] = self.position[house]
+
+        # add the house at the end of the new battery
+        members = self.members[battery]
+        self.position[house] = len(members)
+        members.append(house)
+
+        # put the house back at its old position when undoing a move
+        if position is not None and position < len(members) - 1:
+            other = members[position]
+            members[position], members[-1] = house, other
+            self.position[other] = len(members) - 1
+            self.position[house] = position
+
+        # update the assignment and the remaining capacity
+        self.assignment[house] = battery
+        self.remaining[old] += self.house_energy[house]
+        self.remaining[battery] -= self.house_energy[house]
+
+    def apply(self, moves: List[Tuple[int, int]]) -> int:
+        """
+        This function moves houses to new batteries, updates the cables of
+        the changed batteries and logs the move
+
+        Args:
+            moves (List[Tuple[int, int]]): pairs of house and new battery
+
+        Returns:
+            int: the new costs
+        """
+
+        relocations: List[Tuple[int, int, int]] = []
+        old_cables: Dict[int, int] = {}
+
+        for house, battery in moves:
+            # remember the old battery and cables of both batteries
+            old = self.assignment[house]
+            relocations.append((house, old, self.position[house]))
+            old_cables.setdefault(old, self.num_cables[old])
+            old_cables.setdefault(battery, self.num_cables[battery])
+
+            self.relocate(house, battery)
+
+        # only merge the paths of the changed batteries again
+        for battery, cables in old_cables.items():
+            self.num_cables[battery] = self.count_cables(battery)
+            self.total_cables += self.num_cables[battery] - cables
+
+        self.log.append((relocations, old_cables))
+
+        return self.costs()
+
+    def swap(self, house_1: int, house_2: int) -> int:
+        """
+        This function switches the batteries of 2 houses
+
+        Args:
+            house_1 (int): index of a house
+            house_2 (int): index of another house
+
+        Returns:
+            int: the new costs
+        """
+
+        return self.apply([(house_1, self.assignment[house_2]),
+                           (house_2, self.assignment[house_1])])
+
+    def undo(self) -> None:
+        """
+        This function undoes the last logged move
+        """
+
+        relocations, old_cables = self.log.pop()
+
+        # move the houses back in reversed order
+        for house, battery, position in reversed(relocations):
+            self.relocate(house, battery, position)
+
+        # restore the cached number of cables
+        for battery, cables in old_cables.items():
+            self.total_cables += cables - self.num_cables[battery]
+            self.num_cables[battery] = cables
+
+    def commit(self) -> None:
+        """
+        This function accepts all logged moves such that the log stays small
+        """
+
+        self.log.clear()
+
+    def snapshot(self) -> List[List[int]]:
+        """
+        This function copies the houses of every battery in merge order
+
+        Returns:
+            List[List[int]]: house indices for every battery
+        """
+
+        return [list(members) for members in self.members]
@@ -0,0 +1,73 @@
+"""
+This program finds the assignment of the houses to the batteries with the
+smallest total distance that fits in the capacities of the batteries, with
+an integer program
+"""
+
+from Additional_code.district import District
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy import sparse
+from typing import Final, Optional
+import numpy as np
+
+# default number of seconds the solver may search
+TIME_LIMIT: Final = 10.0
+
+
+def optimal_assignment(district: District,
+                       time_limit: float = TIME_LIMIT,
+                       costs: Optional[np.ndarray] = None,
+                       gap: float = 0.0) -> Optional[np.ndarray]:
+    """
+    This function solves the capacitated assignment of the houses: every
+    house connects to exactly 1 battery, the outputs of the houses of a
+    battery are at most its capacity and the sum of the Manhattan distances
+    from the houses to their batteries is as small as possible. When the
+    time limit is reached the best assignment found so far is used.
+
+    Args:
+        district (District): district with the houses and batteries
+        time_limit (float): maximum number of seconds of the solver
+        costs (Optional[np.ndarray]): (H, B) costs of connecting every house
+            to every battery instead of the distances
+        gap (float): stop when the costs are at most this fraction above
+            the lower bound of the solver
+
+    Returns:
+        Optional[np.ndarray]: (H,) battery of every house, None if no
+            assignment has been found
+    """
+
+    num_houses, num_batteries = district.num_houses, district.num_batteries
+
+    # variable h * B + b is 1 if house h connects to battery b
+    if costs is None:
+        costs = district.distances()
+    costs = costs.ravel()
+
+    # every house connects to exactly 1 battery
+    houses = LinearConstraint(
+        sparse.kron(sparse.eye(num_houses), np.ones((1, num_batteries))),
+        1, 1)
+
+    # the outputs of the houses of a battery fit in its capacity
+    capacities = LinearConstraint(
+        sparse.kron(district.house_output[None, :], sparse.eye(num_batteries)),
+        -np.inf, district.capacity)
+
+    result = milp(costs, constraints=[houses, capacities],
+                  integrality=np.ones(len(costs)), bounds=Bounds(0, 1),
+                  options={'time_limit': time_limit, 'mip_rel_gap': gap})
+
+    if result.x is None:
+        return None
+
+    assignment = result.x.reshape(num_houses, num_batteries).argmax(axis=1)
+
+    # check the rounded solution, the solver works with a small tolerance
+    loads = np.bincount(assignment, weights=district.house_output,
+                        minlength=num_batteries)
+    if np.any(loads > district.capacity):
+        return None
+
+    return assignment
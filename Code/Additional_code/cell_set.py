@@ -0,0 +1,134 @@
+"""
+This program creates an ordered set of grid cells to remove duplicate
+points of paths without pandas
+"""
+
+from __future__ import annotations
+from typing import Dict, Final, Iterable, Iterator, List, Tuple
+import numpy as np
+
+# default width for encoding the cells, larger than any district
+DEFAULT_WIDTH: Final = 1 << 16
+
+
+class CellSet:
+    """
+    Ordered set of grid cells. Every cell (x, y) is stored as the integer
+    y * width + x, in the order in which the cells were added.
+    """
+    def __init__(self, cells: Iterable[Tuple[int, int]] = (),
+                 width: int = DEFAULT_WIDTH) -> None:
+        """
+        Creates the set with the given cells, duplicates are removed.
+
+        Args:
+            cells (Iterable[Tuple[int, int]]): cells to add.
+            width (int): width of the grid, larger than every x value.
+        """
+
+        self.width = width
+        self.codes: Dict[int, None] = {}
+        self.update(cells)
+
+    @classmethod
+    def from_array(cls, path: np.ndarray,
+                   width: int = DEFAULT_WIDTH) -> CellSet:
+        """
+        This function creates the set from an (N, 2) array of cells
+
+        Args:
+            path (np.ndarray): (N, 2) integer array with a row per cell
+            width (int): width of the grid, larger than every x value
+
+        Returns:
+            CellSet: the set with the cells of the path
+        """
+
+        cell_set = cls(width=width)
+        codes = path[:, 1] * width + path[:, 0]
+        cell_set.codes = dict.fromkeys(codes.tolist())
+
+        return cell_set
+
+    def encode(self, cell: Tuple[int, int]) -> int:
+        """
+        This function encodes a cell as integer
+
+        Args:
+            cell (Tuple[int, int]): a cell
+
+        Returns:
+            int: the code of the cell
+        """
+
+        return int(cell[1]) * self.width + int(cell[0])
+
+    def decode(self, code: int) -> Tuple[int, int]:
+        """
+        This function decodes an integer to a cell
+
+        Args:
+            code (int): the code of a cell
+
+        Returns:
+            Tuple[int, int]: the cell
+        """
+
+        y, x = divmod(code, self.width)
+        return (x, y)
+
+    def add(self, cell: Tuple[int, int]) -> None:
+        """
+        This function adds a cell if it is not in the set yet
+
+        Args:
+            cell (Tuple[int, int]): a cell
+        """
+
+        self.codes[self.encode(cell)] = None
+
+    def update(self, cells: Iterable[Tuple[int, int]]) -> None:
+        """
+        This function adds all cells which are not in the set yet
+
+        Args:
+            cells (Iterable[Tuple[int, int]]): cells to add
+        """
+
+        for cell in cells:
+            self.codes[self.encode(cell)] = None
+
+    def union(self, other: CellSet) -> CellSet:
+        """
+        This function creates a new set with the cells of both sets
+
+        Args:
+            other (CellSet): another set with the same width
+
+        Returns:
+            CellSet: the cells of this set followed by the new cells of other
+        """
+
+        cell_set = CellSet(width=self.width)
+        cell_set.codes = {**self.codes, **other.codes}
+
+        return cell_set
+
+    def to_list(self) -> List[Tuple[int, int]]:
+        """
+        This function gives all cells in order
+
+        Returns:
+            List[Tuple[int, int]]: all cells
+        """
+
+        return list(self)
+
+    def __contains__(self, cell: Tuple[int, int]) -> bool:
+        return self.encode(cell) in self.codes
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return (self.decode(code) for code in self.codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
@@ -0,0 +1,143 @@
+"""
+This program saves and loads checkpoints of the optimization: the houses
+of every battery, the best composition, the size of the trace, the state of
+the cooling schedule, the move generator and the random generator. A long run
+can continue from its last checkpoint.
+"""
+
+from Additional_code.district import District
+from typing import Any, Dict, Final, List, Tuple
+import numpy as np
+import json
+import os
+import random
+
+# default path of the checkpoints, with the same fields as the output
+CHECKPOINT: Final = "Smartgrid_data/checkpoint{district}_{version}.npz"
+
+
+def pack(members: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    This function stores the houses of every battery in 2 arrays
+
+    Args:
+        members (List[List[int]]): houses of every battery in order of
+            connection
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: the houses of all batteries after
+            each other and the number of houses of every battery
+    """
+
+    houses = [house for battery in members for house in battery]
+
+    return (np.array(houses, dtype=np.int64),
+            np.array([len(battery) for battery in members], dtype=np.int64))
+
+
+def unpack(houses: np.ndarray, sizes: np.ndarray) -> List[List[int]]:
+    """
+    This function creates the houses of every battery from 2 arrays
+
+    Args:
+        houses (np.ndarray): the houses of all batteries after each other
+        sizes (np.ndarray): the number of houses of every battery
+
+    Returns:
+        List[List[int]]: houses of every battery in order of connection
+    """
+
+    return [battery.tolist() for battery in
+            np.split(houses, np.cumsum(sizes)[:-1])]
+
+
+def save_checkpoint(path: str, district: District,
+                    members: List[List[int]], best: List[List[int]],
+                    information: Dict[str, Any]) -> None:
+    """
+    This function writes a checkpoint at once, so an interruption while
+    writing keeps the previous checkpoint
+
+    Args:
+        path (str): path of the npz file
+        district (District): district with the batteries of the run
+        members (List[List[int]]): current houses of every battery
+        best (List[List[int]]): houses of every battery of the best
+            composition
+        information (Dict[str, Any]): iteration, costs, size of the trace
+            and the states of the schedule and generators, which can be
+            written as json
+    """
+
+    houses, sizes = pack(members)
+    best_houses, best_sizes = pack(best)
+    information = {**information, "random": random.getstate()}
+
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as checkpoint_file:
+        np.savez_compressed(checkpoint_file, houses=houses, sizes=sizes,
+                            best_houses=best_houses, best_sizes=best_sizes,
+                            battery_points=district.battery_points(),
+                            capacity=district.capacity,
+                            battery_costs=district.battery_costs,
+                            information=np.array(json.dumps(information)))
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    """
+    This function reads a checkpoint
+
+    Args:
+        path (str): path of the npz file
+
+    Returns:
+        Dict[str, Any]: the information of the checkpoint with the houses
+            of every battery as 'members' and 'best' and the batteries as
+            'battery_points', 'capacity' and 'battery_costs'
+    """
+
+    with np.load(path) as data:
+        checkpoint: Dict[str, Any] = json.loads(str(data['information']))
+        checkpoint["members"] = unpack(data['houses'], data['sizes'])
+        checkpoint["best"] = unpack(data['best_houses'], data['best_sizes'])
+        for name in ['battery_points', 'capacity', 'battery_costs']:
+            checkpoint[name] = data[name]
+
+    return checkpoint
+
+
+def restore_random(checkpoint: Dict[str, Any]) -> None:
+    """
+    This function continues the random generator from a checkpoint
+
+    Args:
+        checkpoint (Dict[str, Any]): a loaded checkpoint
+    """
+
+    version, state, gauss = checkpoint["random"]
+    random.setstate((version, tuple(state), gauss))
+
+
+def check_checkpoint(checkpoint: Dict[str, Any], district: District,
+                     information: Dict[str, Any]) -> None:
+    """
+    This function checks that a checkpoint belongs to the same run
+
+    Args:
+        checkpoint (Dict[str, Any]): a loaded checkpoint
+        district (District): district of the run
+        information (Dict[str, Any]): settings of the run which must be
+            the same as in the checkpoint
+    """
+
+    for key, value in information.items():
+        if checkpoint.get(key) != value:
+            raise ValueError(f"the checkpoint has {key} "
+                             f"{checkpoint.get(key)!r} instead of {value!r}")
+
+    houses = sum(len(battery) for battery in checkpoint["members"])
+    if (houses != district.num_houses or
+            not np.array_equal(checkpoint["battery_points"],
+                               district.battery_points())):
+        raise ValueError("the checkpoint belongs to another district")
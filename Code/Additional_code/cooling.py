@@ -0,0 +1,214 @@
+"""
+This program has the cooling schedules and the acceptance rule for
+simulated annealing
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Final
+import math
+import random
+
+# default start and end temperature of the cooling schedules
+START_TEMPERATURE: Final = 100.0
+END_TEMPERATURE: Final = 1.0
+
+
+def metropolis(delta: float, temperature: float) -> bool:
+    """
+    This function decides whether a change in costs is accepted. Better
+    changes are always accepted, worse changes with probability
+    exp(-delta / temperature).
+
+    Args:
+        delta (float): new costs minus old costs
+        temperature (float): current temperature
+
+    Returns:
+        bool: True if the change is accepted
+    """
+
+    if delta <= 0:
+        return True
+    if temperature <= 0:
+        return False
+
+    return random.random() < math.exp(-delta / temperature)
+
+
+class Schedule:
+    """
+    Cooling schedule which lowers the temperature every iteration
+    """
+    def __init__(self, iterations: int, start: float = START_TEMPERATURE,
+                 end: float = END_TEMPERATURE) -> None:
+        """
+        Creates a schedule that starts at the start temperature.
+
+        Args:
+            iterations (int): number of iterations of the annealing.
+            start (float): temperature at the first iteration.
+            end (float): temperature at the last iteration.
+        """
+
+        self.iterations = max(iterations, 1)
+        self.start = start
+        self.end = end
+        self.temperature = start
+        self.iteration = 0
+
+    def accept(self, delta: float) -> bool:
+        """
+        This function decides whether a change in costs is accepted at the
+        current temperature
+
+        Args:
+            delta (float): new costs minus old costs
+
+        Returns:
+            bool: True if the change is accepted
+        """
+
+        return metropolis(delta, self.temperature)
+
+    def step(self, improved: bool = False) -> None:
+        """
+        This function goes to the next iteration and lowers the temperature
+
+        Args:
+            improved (bool): whether the iteration found new best costs
+        """
+
+        self.iteration += 1
+        self.temperature = self.update(improved)
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """
+        This function gives the state of the schedule for a checkpoint
+
+        Returns:
+            Dict[str, Any]: the temperature, iteration and other settings
+        """
+
+        return dict(vars(self))
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """
+        This function continues the schedule from a checkpoint
+
+        Args:
+            state (Dict[str, Any]): the state of the schedule
+        """
+
+        vars(self).update(state)
+
+    def update(self, improved: bool) -> float:
+        """
+        This function calculates the temperature of the current iteration
+
+        Args:
+            improved (bool): whether the iteration found new best costs
+
+        Returns:
+            float: the new temperature
+        """
+
+        raise NotImplementedError
+
+
+class GeometricSchedule(Schedule):
+    """
+    Multiplies the temperature by the same factor every iteration
+    """
+    def update(self, improved: bool) -> float:
+        alpha = (self.end / self.start) ** (1 / self.iterations)
+        return self.start * alpha ** self.iteration
+
+
+class LinearSchedule(Schedule):
+    """
+    Lowers the temperature by the same amount every iteration
+    """
+    def update(self, improved: bool) -> float:
+        fraction = min(self.iteration / self.iterations, 1)
+        return self.start - (self.start - self.end) * fraction
+
+
+class LogarithmicSchedule(Schedule):
+    """
+    Lowers the temperature with the logarithm of the iteration, which cools
+    slowly for long runs
+    """
+    def update(self, improved: bool) -> float:
+        return self.start * math.log(2) / math.log(self.iteration + 2)
+
+
+class AdaptiveSchedule(Schedule):
+    """
+    Cools geometrically, but heats up again when the best costs have not
+    improved for a number of iterations
+    """
+    def __init__(self, iterations: int, start: float = START_TEMPERATURE,
+                 end: float = END_TEMPERATURE, patience: int = 0,
+                 reheat: float = 0.5) -> None:
+        """
+        Creates an adaptive schedule.
+
+        Args:
+            iterations (int): number of iterations of the annealing.
+            start (float): temperature at the first iteration.
+            end (float): temperature at the last iteration without reheats.
+            patience (int): iterations without improvement before a reheat,
+                a tenth of the iterations if 0.
+            reheat (float): fraction of the start temperature after a reheat.
+        """
+
+        super().__init__(iterations, start, end)
+        self.patience = patience or max(self.iterations // 10, 1)
+        self.reheat = reheat
+
+        # temperature and iteration where the cooling (re)started
+        self.reheat_temperature = start
+        self.reheat_iteration = 0
+        self.since_improvement = 0
+
+    def update(self, improved: bool) -> float:
+        alpha = (self.end / self.start) ** (1 / self.iterations)
+
+        # heat up again when no better costs have been found for a while
+        self.since_improvement = 0 if improved else self.since_improvement + 1
+        if self.since_improvement >= self.patience:
+            self.since_improvement = 0
+            self.reheat_temperature = max(self.temperature,
+                                          self.start * self.reheat)
+            self.reheat_iteration = self.iteration
+
+        return (self.reheat_temperature *
+                alpha ** (self.iteration - self.reheat_iteration))
+
+
+# all schedules by name
+SCHEDULES: Final[Dict[str, type]] = {
+    "geometric": GeometricSchedule,
+    "linear": LinearSchedule,
+    "logarithmic": LogarithmicSchedule,
+    "adaptive": AdaptiveSchedule,
+}
+
+
+def create_schedule(name: str, iterations: int,
+                    start: float = START_TEMPERATURE,
+                    end: float = END_TEMPERATURE) -> Schedule:
+    """
+    This function creates a cooling schedule by name
+
+    Args:
+        name (str): name of the schedule, a key of SCHEDULES
+        iterations (int): number of iterations of the annealing
+        start (float): temperature at the first iteration
+        end (float): temperature at the last iteration
+
+    Returns:
+        Schedule: the cooling schedule
+    """
+
+    return SCHEDULES[name](iterations, start, end)
@@ -1,100 +1,223 @@
 """
 This programs distributes all the houses s.t. all the houses
-are connected to batteries
+are connected to batteries. The unconnected houses are packed with best
+fit decreasing, and room is made by moving or swapping connected houses.
 """
 
-from Agents.house import House
-from Agents.battery import Battery
-from typing import List
+from Additional_code.assignment import optimal_assignment
+from Additional_code.district import District
+from typing import List, Optional, Tuple
+import numpy as np
 
+# a repair step: the cost in extra distance and the houses that move to
+# another battery
+Repair = Tuple[int, List[Tuple[int, int]]]
 
-def distribute(batteries: List[Battery], houses: List[House]) -> None:
+
+def best_fit(district: District, house: int) -> Optional[int]:
     """
-    This function distributes house s.t. the remaining unconnected
-    houses can be placed
+    This function finds the battery with the least capacity left after
+    connecting the house
 
     Args:
-        batteries (List[Battery]): all batteries
-        houses (List[House]): unconnected houses
+        district (District): district with the connected houses
+        house (int): index of an unconnected house
+
+    Returns:
+        Optional[int]: index of the battery, None if the house fits nowhere
     """
 
-    for house in houses:
-        house_added: bool = False
+    slack = district.remaining - district.house_output[house]
+    if not np.any(slack >= 0):
+        return None
 
-        # sort batteries by left over capacity
-        batteries.sort(key=lambda x: x.energy, reverse=True)
+    return int(np.argmin(np.where(slack >= 0, slack, np.inf)))
+
+
+def best_move(district: District, house: int,
+              distances: np.ndarray) -> Optional[Repair]:
+    """
+    This function finds the cheapest way to make room for a house by moving
+    1 connected house to another battery
 
-        # batterie with highest energy will receive the house
-        destination = batteries[0]
+    Args:
+        district (District): district with the connected houses
+        house (int): index of an unconnected house
+        distances (np.ndarray): (H, B) distances of the district
 
-        # reverse list so that least priority houses are at the front
-        destination.houses.reverse()
+    Returns:
+        Optional[Repair]: the cheapest repair, None if there is none
+    """
 
-        for helper in batteries[1:]:
-            # max energy helper battery can receive
-            capacity = helper.energy
+    output, remaining = district.house_output, district.remaining
+    best: Optional[Repair] = None
 
-            # move a house from the destination to helper if enough capacity
-            for switch in destination.houses[:10]:
-                if switch.energy <= capacity:
-                    destination.remove_house(switch)
-                    helper.add_house(switch)
+    for battery, members in enumerate(district.members):
+        if not members:
+            continue
+        houses = np.array(members)
 
-                    # if enough space in destination add the unplaced house
-                    if destination.energy >= house.energy:
-                        destination.houses.reverse()
-                        destination.add_house(house)
-                        house_added = True
+        # the houses that make enough room when they leave
+        enough = remaining[battery] + output[houses] >= output[house]
 
-        if house_added:
+        # (houses, batteries) whether the house fits in the other battery
+        fits = remaining[None, :] >= output[houses, None]
+        fits[:, battery] = False
+        fits &= enough[:, None]
+        if not fits.any():
             continue
 
-        # if the unplaced house is not added yet make more space
-        for helper in batteries[1:]:
-            # we will trade a house from helper and destination to make space
-            while True:
-                capacity = helper.energy
-                # we only consider houses with low priority
-                candidates_dest = destination.houses[:10]
-
-                # reverse list so that least priority houses are at the front
-                helper.houses.reverse()
-                candidates_helper = helper.houses[:10]
-
-                # the helper list can get a max netto increase of capacity
-                biggest_change = 0
-
-                for k in candidates_dest:
-                    for z in candidates_helper:
-                        change = k.energy - z.energy
-
-                        if change > biggest_change and change < capacity:
-                            best_dest = k
-                            best_help = z
-                            biggest_change = change
-
-                # if a good change has been found make it
-                if biggest_change > 0:
-                    # disconnect both houses from their lists
-                    destination.remove_house(best_dest)
-                    helper.remove_house(best_help)
-
-                    # reverse lists to reestablish priority
-                    helper.houses.reverse()
-                    destination.houses.reverse()
-
-                    # add houses back to the opposite list
-                    helper.add_house(best_dest)
-                    destination.add_house(best_help)
-
-                    # reverse the destination list
-                    destination.houses.reverse()
-                else:
-                    break
-
-            # add unplaced house to the destination battery when space
-            if destination.energy >= house.energy:
-                destination.houses.reverse()
-                destination.add_house(house)
-                house_added = True
-                break
+        costs = (distances[houses] - distances[houses, battery][:, None] +
+                 distances[house, battery])
+        costs = np.where(fits, costs, np.iinfo(np.int64).max)
+        i, other = np.unravel_index(np.argmin(costs), costs.shape)
+
+        if best is None or costs[i, other] < best[0]:
+            best = (int(costs[i, other]),
+                    [(int(houses[i]), int(other)), (house, battery)])
+
+    return best
+
+
+def best_swap(district: District, house: int,
+              distances: np.ndarray) -> Optional[Repair]:
+    """
+    This function finds the cheapest way to make room for a house by
+    swapping 2 connected houses of different batteries
+
+    Args:
+        district (District): district with the connected houses
+        house (int): index of an unconnected house
+        distances (np.ndarray): (H, B) distances of the district
+
+    Returns:
+        Optional[Repair]: the cheapest repair, None if there is none
+    """
+
+    output, remaining = district.house_output, district.remaining
+    best: Optional[Repair] = None
+
+    for battery, members in enumerate(district.members):
+        for other, others in enumerate(district.members):
+            if other == battery or not members or not others:
+                continue
+            leaving, coming = np.array(members), np.array(others)
+
+            # change in the output of the battery for every swap
+            change = output[coming][None, :] - output[leaving][:, None]
+
+            # room for the house in battery and for the swap in other
+            fits = ((remaining[battery] - change >= output[house]) &
+                    (remaining[other] + change >= 0))
+            if not fits.any():
+                continue
+
+            costs = (distances[leaving, other][:, None] +
+                     distances[coming, battery][None, :] -
+                     distances[leaving, battery][:, None] -
+                     distances[coming, other][None, :] +
+                     distances[house, battery])
+            costs = np.where(fits, costs, np.iinfo(np.int64).max)
+            i, j = np.unravel_index(np.argmin(costs), costs.shape)
+
+            if best is None or costs[i, j] < best[0]:
+                best = (int(costs[i, j]),
+                        [(int(leaving[i]), other), (int(coming[j]), battery),
+                         (house, battery)])
+
+    return best
+
+
+def distribute(district: District, houses: List[int]) -> List[int]:
+    """
+    This function distributes house s.t. the remaining unconnected
+    houses can be placed. The largest houses are placed first in the
+    battery where they fit best. If a house fits nowhere, the cheapest move
+    or swap of connected houses that makes room is done. If that is not
+    possible either, all houses are assigned again with the integer program.
+    Every house is tried once, so the repair always ends.
+
+    Args:
+        district (District): district with the connected houses
+        houses (List[int]): indices of the unconnected houses
+
+    Returns:
+        List[int]: houses for which no feasible repair has been found
+    """
+
+    output = district.house_output
+    distances = district.distances()
+    not_placed: List[int] = []
+
+    # the largest houses are the hardest to place
+    for house in sorted(houses, key=lambda house: -output[house]):
+        battery = best_fit(district, house)
+        if battery is not None:
+            district.connect(house, battery)
+            continue
+
+        # make room with the cheapest move or swap
+        repairs = [repair for repair in
+                   (best_move(district, house, distances),
+                    best_swap(district, house, distances))
+                   if repair is not None]
+        if not repairs:
+            not_placed.append(house)
+            continue
+
+        cost, moves = min(repairs, key=lambda repair: repair[0])
+        for moving, battery in moves:
+            if district.assignment[moving] >= 0:
+                district.disconnect(moving)
+            district.connect(moving, battery)
+
+    if not not_placed:
+        return not_placed
+
+    # assign all houses again when the local repairs are not enough, with
+    # as few connected houses as possible moving to another battery
+    moved = np.ones((district.num_houses, district.num_batteries))
+    connected = np.flatnonzero(district.assignment >= 0)
+    moved[connected, district.assignment[connected]] = 0
+    assignment = optimal_assignment(district, costs=moved, gap=1.0)
+    if assignment is None:
+        return not_placed
+
+    # keep the order of connection of the houses which stay
+    members = [[house for house in district.members[battery]
+                if assignment[house] == battery]
+               for battery in range(district.num_batteries)]
+    staying = {house for houses in members for house in houses}
+    for house in range(district.num_houses):
+        if house not in staying:
+            members[assignment[house]].append(house)
+    district.assign(members)
+
+    return []
+
+
+def link_closest(district: District, order: List[int]) -> List[int]:
+    """
+    This function connects the houses in order to the closest battery with
+    enough capacity left
+
+    Args:
+        district (District): district without connections
+        order (List[int]): indices of the houses in order of connection
+
+    Returns:
+        List[int]: houses that fit in no battery, which can be distributed
+    """
+
+    output, distances = district.house_output, district.distances()
+    not_placed: List[int] = []
+
+    for house in order:
+        fits = district.remaining >= output[house]
+        if fits.any():
+            district.connect(house, int(np.argmin(
+                np.where(fits, distances[house], np.inf))))
+        else:
+            not_placed.append(house)
+
+    return not_placed
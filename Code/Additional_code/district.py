@@ -0,0 +1,547 @@
+"""
+This program creates the compact core of a smartgrid: the houses,
+batteries, connections and cables of a district are stored in numpy arrays
+instead of agents, the agents are only created for the visualisation
+"""
+
+from __future__ import annotations
+from Additional_code.cell_set import CellSet
+from Additional_code.lay_cables import route_cables
+from Additional_code.steiner import STEINER_BUDGET, STEINER_ROUNDS
+from Additional_code.tree_cache import TreeCache
+from typing import Any, Dict, Final, List, Optional, Tuple, Union
+from functools import lru_cache
+import numpy as np
+import zipfile
+import glob
+import os
+
+# costs of a cable and of a battery of the districts
+CABLE_COSTS: Final = 9
+BATTERY_COSTS: Final = 5000
+
+
+# a district is the number of a bundled district or the path of a folder
+# with a houses and a batteries csv file
+DistrictKey = Union[int, str]
+
+# folder of the bundled districts
+DISTRICTS: Final = 'Huizen&Batterijen'
+
+
+def parse_district(value: str) -> DistrictKey:
+    """
+    This function converts a district argument to a district number, or
+    keeps it as the path of a district folder
+
+    Args:
+        value (str): district number or path
+
+    Returns:
+        DistrictKey: the district
+    """
+
+    return int(value) if value.isdigit() else value
+
+
+def district_name(district: DistrictKey) -> str:
+    """
+    This function gives a short name of a district for file names
+
+    Args:
+        district (DistrictKey): district number or path
+
+    Returns:
+        str: the number or the name of the folder
+    """
+
+    if isinstance(district, int):
+        return str(district)
+
+    return os.path.basename(os.path.normpath(district))
+
+
+def district_files(district: DistrictKey) -> Tuple[str, str]:
+    """
+    This function finds the csv files of the houses and batteries
+
+    Args:
+        district (DistrictKey): district number or path
+
+    Returns:
+        Tuple[str, str]: paths of the houses and the batteries csv files
+    """
+
+    if isinstance(district, int):
+        path = f'{DISTRICTS}/district_{district}/district-{district}_'
+        return path + 'houses.csv', path + 'batteries.csv'
+
+    files = []
+    for info in ['houses', 'batteries']:
+        matches = sorted(glob.glob(os.path.join(glob.escape(district),
+                                                f'*{info}.csv')))
+        if len(matches) != 1:
+            raise FileNotFoundError(f"expected 1 {info} csv file in "
+                                    f"{district}, found {len(matches)}")
+        files.append(matches[0])
+
+    return files[0], files[1]
+
+
+def load_csv(path: str) -> np.ndarray:
+    """
+    This function parses a csv file of a district into an array. The array
+    is cached in a npz file next to the csv file, which is used as long as
+    the csv file has not been changed.
+
+    Args:
+        path (str): path of the csv file
+
+    Returns:
+        np.ndarray: (N, 3) x, y and output or capacity of every row
+    """
+
+    cache = os.path.splitext(path)[0] + '.npz'
+    mtime = os.stat(path).st_mtime_ns
+
+    # use the cache if it belongs to this version of the csv file
+    try:
+        with np.load(cache) as data:
+            if int(data['mtime']) == mtime:
+                return data['values']
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        pass
+
+    # the coordinates of the batteries are quoted in 1 column
+    with open(path, 'r') as csv_file:
+        lines = [line.replace('"', '') for line in csv_file]
+    values = np.loadtxt(lines[1:], delimiter=',', ndmin=2)
+
+    # write the cache at once, parallel processes may read it already
+    temporary = f'{cache}.{os.getpid()}.tmp'
+    try:
+        with open(temporary, 'wb') as cache_file:
+            np.savez(cache_file, values=values, mtime=mtime)
+        os.replace(temporary, cache)
+    except OSError:
+        # without a cache the csv file is parsed every time
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+    return values
+
+
+@lru_cache(maxsize=None)
+def read_district(district: DistrictKey) -> Tuple[np.ndarray, np.ndarray,
+                                                  np.ndarray, np.ndarray]:
+    """
+    This function reads the houses and batteries of a district
+
+    Args:
+        district (DistrictKey): district number or path
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: (H, 2)
+            coordinates and outputs of the houses, (B, 2) coordinates and
+            capacities of the batteries
+    """
+
+    houses, batteries = (load_csv(path) for path in district_files(district))
+
+    return (houses[:, :2].astype(np.int64), houses[:, 2],
+            batteries[:, :2].astype(np.int64), batteries[:, 2])
+
+
+class District:
+    """
+    Smartgrid district in columns. Houses and batteries are indices in the
+    arrays, every house has the index of its battery in the assignment and
+    the cables of every battery are a bitmap of the grid.
+    """
+    def __init__(self, house_points: np.ndarray, outputs: np.ndarray,
+                 battery_points: np.ndarray, capacities: np.ndarray,
+                 battery_costs: np.ndarray) -> None:
+        """
+        Creates a district without connections and cables.
+
+        Args:
+            house_points (np.ndarray): (H, 2) coordinates of the houses.
+            outputs (np.ndarray): (H,) outputs of the houses.
+            battery_points (np.ndarray): (B, 2) coordinates of the batteries.
+            capacities (np.ndarray): (B,) capacities of the batteries.
+            battery_costs (np.ndarray): (B,) costs of the batteries.
+        """
+
+        # houses
+        self.house_x = np.asarray(house_points, dtype=np.int64)[:, 0].copy()
+        self.house_y = np.asarray(house_points, dtype=np.int64)[:, 1].copy()
+        self.house_output = np.asarray(outputs, dtype=float).copy()
+
+        # batteries
+        self.battery_x = np.asarray(battery_points,
+                                    dtype=np.int64)[:, 0].copy()
+        self.battery_y = np.asarray(battery_points,
+                                    dtype=np.int64)[:, 1].copy()
+        self.capacity = np.asarray(capacities, dtype=float).copy()
+        self.battery_costs = np.asarray(battery_costs, dtype=np.int64).copy()
+
+        # battery of every house, -1 if not connected, and the houses of
+        # every battery in order of connection
+        self.assignment = np.full(self.num_houses, -1, dtype=np.int64)
+        self.remaining = self.capacity.copy()
+        self.members: List[List[int]] = [[] for _ in
+                                         range(self.num_batteries)]
+
+        # cable bitmap of every battery and the cables in order of laying
+        width, height = self.bound()
+        self.cables = np.zeros((self.num_batteries, width + 1, height + 1),
+                               dtype=bool)
+        self.paths: List[List[Tuple[int, int]]] = [[] for _ in
+                                                   range(self.num_batteries)]
+
+        # whether the houses of a battery share their cables (version 2)
+        # or every house has its own cables (version 1)
+        self.shared = True
+
+        # merged trees of the sets of houses that have been seen
+        self.tree_cache = TreeCache()
+
+        # distances from the houses to the batteries, once needed
+        self._distances: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_csv(cls, district: DistrictKey) -> District:
+        """
+        This function creates the district with its own batteries
+
+        Args:
+            district (DistrictKey): district number or path
+
+        Returns:
+            District: the district without connections
+        """
+
+        house_points, outputs, battery_points, capacities = read_district(
+            district)
+        costs = np.full(len(battery_points), BATTERY_COSTS)
+
+        return cls(house_points, outputs, battery_points, capacities, costs)
+
+    def with_batteries(self, battery_points: np.ndarray,
+                       capacities: np.ndarray,
+                       battery_costs: np.ndarray) -> District:
+        """
+        This function creates a district with the same houses and other
+        batteries
+
+        Args:
+            battery_points (np.ndarray): (B, 2) coordinates of the batteries
+            capacities (np.ndarray): (B,) capacities of the batteries
+            battery_costs (np.ndarray): (B,) costs of the batteries
+
+        Returns:
+            District: the district without connections
+        """
+
+        return District(self.house_points(), self.house_output,
+                        battery_points, capacities, battery_costs)
+
+    @property
+    def num_houses(self) -> int:
+        return len(self.house_x)
+
+    @property
+    def num_batteries(self) -> int:
+        return len(self.battery_x)
+
+    def house_points(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: (H, 2) coordinates of the houses
+        """
+
+        return np.column_stack((self.house_x, self.house_y))
+
+    def battery_points(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: (B, 2) coordinates of the batteries
+        """
+
+        return np.column_stack((self.battery_x, self.battery_y))
+
+    def bound(self) -> Tuple[int, int]:
+        """
+        This function generates the boundaries of the grid
+
+        Returns:
+            Tuple[int, int]: the maximum x and y values for the grid
+        """
+
+        return (int(max(self.house_x.max(), self.battery_x.max())),
+                int(max(self.house_y.max(), self.battery_y.max())))
+
+    def distances(self) -> np.ndarray:
+        """
+        This function calculates the Manhattan distance from every house to
+        every battery once, the houses and batteries do not move
+
+        Returns:
+            np.ndarray: (H, B) read-only distances
+        """
+
+        if self._distances is None:
+            self._distances = (
+                np.abs(self.house_x[:, None] - self.battery_x[None, :]) +
+                np.abs(self.house_y[:, None] - self.battery_y[None, :]))
+            self._distances.flags.writeable = False
+
+        return self._distances
+
+    def regret(self, k: Optional[int] = None) -> np.ndarray:
+        """
+        This function calculates how much further the k-th closest battery
+        of every house is than the closest battery. Houses with a large
+        regret lose the most when their closest battery is full.
+
+        Args:
+            k (Optional[int]): compare with the k-th closest battery, the
+                furthest battery if None or if there are fewer batteries
+
+        Returns:
+            np.ndarray: (H,) regret of every house
+        """
+
+        ordered = np.sort(self.distances(), axis=1)
+        k = self.num_batteries if k is None else min(max(k, 1),
+                                                     self.num_batteries)
+
+        return ordered[:, k - 1] - ordered[:, 0]
+
+    def fits(self, house: int, battery: int) -> bool:
+        """
+        This function checks whether a house fits in a battery
+
+        Args:
+            house (int): index of the house
+            battery (int): index of the battery
+
+        Returns:
+            bool: True if the battery has enough capacity left
+        """
+
+        return bool(self.remaining[battery] >= self.house_output[house])
+
+    def connect(self, house: int, battery: int) -> None:
+        """
+        This function connects a not connected house to a battery
+
+        Args:
+            house (int): index of the house
+            battery (int): index of the battery
+        """
+
+        self.assignment[house] = battery
+        self.remaining[battery] -= self.house_output[house]
+        self.members[battery].append(house)
+
+    def disconnect(self, house: int) -> None:
+        """
+        This function disconnects a house from its battery
+
+        Args:
+            house (int): index of a connected house
+        """
+
+        battery = self.assignment[house]
+        self.members[battery].remove(house)
+        self.remaining[battery] += self.house_output[house]
+        self.assignment[house] = -1
+
+    def assign(self, members: List[List[int]]) -> None:
+        """
+        This function connects all houses again as given
+
+        Args:
+            members (List[List[int]]): houses of every battery in order of
+                connection
+        """
+
+        self.assignment[:] = -1
+        self.remaining = self.capacity.copy()
+        self.members = [[] for _ in range(self.num_batteries)]
+
+        for battery, houses in enumerate(members):
+            for house in houses:
+                self.connect(house, battery)
+
+    def own_path(self, house: int) -> List[Tuple[int, int]]:
+        """
+        This function creates the cables of a house to its battery, first
+        horizontal from the house and then vertical to the battery
+
+        Args:
+            house (int): index of a connected house
+
+        Returns:
+            List[Tuple[int, int]]: the cables from the house to the battery
+        """
+
+        battery = self.assignment[house]
+        x, y = int(self.house_x[house]), int(self.house_y[house])
+        end_x = int(self.battery_x[battery])
+        end_y = int(self.battery_y[battery])
+
+        step_x = 1 if end_x >= x else -1
+        step_y = 1 if end_y >= y else -1
+        horizontal = [(i, y) for i in range(x, end_x + step_x, step_x)]
+        vertical = [(end_x, i) for i in range(y, end_y + step_y, step_y)]
+
+        # remove the duplicate coordinates at the turn
+        return CellSet(horizontal + vertical).to_list()
+
+    def lay_cables_v1(self) -> None:
+        """
+        This function lays the cables of every house to its battery without
+        sharing cables with other houses
+        """
+
+        self.shared = False
+        self.cables[:] = False
+
+        for battery, houses in enumerate(self.members):
+            path: List[Tuple[int, int]] = []
+            for house in houses:
+                path += self.own_path(house)
+
+            self.paths[battery] = CellSet(path).to_list()
+            self.draw(battery)
+
+    def lay_cables_v2(self, budget: float = STEINER_BUDGET,
+                      rounds: Optional[int] = STEINER_ROUNDS) -> None:
+        """
+        This function lays the cables of every battery by merging the paths
+        of its houses until 1 path remains, or by routing a Steiner tree if
+        that is shorter, which the houses share
+
+        Args:
+            budget (float): most seconds to search Steiner points per
+                battery
+            rounds (Optional[int]): rounds to search Steiner points per
+                battery, no limit if None
+        """
+
+        self.shared = True
+        self.cables[:] = False
+
+        house_points = list(zip(self.house_x.tolist(),
+                                self.house_y.tolist()))
+
+        for battery, houses in enumerate(self.members):
+            battery_point = (int(self.battery_x[battery]),
+                             int(self.battery_y[battery]))
+            paths = [[battery_point]] + [[house_points[house]]
+                                         for house in houses]
+            merged = self.tree_cache.merged_path(battery_point, houses,
+                                                 house_points)
+
+            self.paths[battery] = route_cables(paths, budget, list(merged),
+                                               rounds)
+            self.draw(battery)
+
+    def draw(self, battery: int) -> None:
+        """
+        This function puts the cables of a battery in its bitmap
+
+        Args:
+            battery (int): index of the battery
+        """
+
+        if self.paths[battery]:
+            xs, ys = zip(*self.paths[battery])
+            self.cables[battery, list(xs), list(ys)] = True
+
+    def house_cables(self, house: int) -> List[Tuple[int, int]]:
+        """
+        This function gives the cables which connect a house
+
+        Args:
+            house (int): index of a connected house
+
+        Returns:
+            List[Tuple[int, int]]: the cables of the house
+        """
+
+        if self.shared:
+            return self.paths[self.assignment[house]]
+
+        return self.own_path(house)
+
+    def num_cables(self) -> int:
+        """
+        This function counts the laid cables. Shared cables are counted once
+        per battery, own cables once per house.
+
+        Returns:
+            int: number of cables
+        """
+
+        if self.shared:
+            return int(self.cables.sum())
+
+        # the own cables of a house are its distance to the battery plus 1
+        connected = self.assignment >= 0
+        distances = self.distances()[connected, self.assignment[connected]]
+
+        return int((distances + 1).sum())
+
+    def split_costs(self) -> Tuple[int, int]:
+        """
+        This function calculates the costs for the cables and the batteries
+
+        Returns:
+            Tuple[int, int]: costs of the cables and costs of the batteries
+        """
+
+        return self.num_cables() * CABLE_COSTS, int(self.battery_costs.sum())
+
+    def costs(self) -> int:
+        """
+        This function calculates the total costs for the cables and batteries
+
+        Returns:
+            int: total costs
+        """
+
+        return sum(self.split_costs())
+
+    def information(self) -> List[Dict[str, Any]]:
+        """
+        This function creates the representation of the batteries and their
+        houses and cables
+
+        Returns:
+            List[Dict[str, Any]]: a dictionary for every battery
+        """
+
+        information: List[Dict[str, Any]] = []
+
+        for battery, houses in enumerate(self.members):
+            dct: Dict[str, Any] = {}
+            dct["location"] = (f"{self.battery_x[battery]},"
+                               f"{self.battery_y[battery]}")
+            dct["capacity"] = float(self.capacity[battery])
+            dct["houses"] = []
+
+            for house in houses:
+                dct_house: Dict[str, Any] = {}
+                dct_house["location"] = (f"{self.house_x[house]},"
+                                         f"{self.house_y[house]}")
+                dct_house["output"] = float(self.house_output[house])
+                dct_house["cables"] = [f"{x},{y}" for x, y
+                                       in self.house_cables(house)]
+                dct["houses"].append(dct_house)
+
+            information.append(dct)
+
+        return information
@@ -2,87 +2,63 @@
 This program places cables smart
 """
 
-from Agents.battery import Battery
-from typing import Tuple, List
-import pandas as pd
-import copy
+from Additional_code.cell_set import CellSet
+from Additional_code.steiner import (STEINER_BUDGET, STEINER_ROUNDS,
+                                     steiner_path)
+from typing import Dict, Final, List, Optional, Set, Tuple, Union
+import numpy as np
+import heapq
 
+# a path as (N, 2) integer array with a row per point
+Path = np.ndarray
 
-def dist_points(point_1: Tuple[int, int], point_2: Tuple[int, int]) -> int:
-    """
-    This function calculates the Manhattan distance between 2 points
-
-    Args:
-        point_1 (tuple[int, int]): a point
-        point_2 (tuple[int, int]): another point
-
-    Returns:
-        int: the manhattan distance between the points
-    """
-
-    return abs(point_1[0] - point_2[0]) + abs(point_1[1] - point_2[1])
+# size of the square buckets of the path index
+BUCKET_SIZE: Final = 8
 
 
-def dist_paths(path_1: List[Tuple[int, int]],
-               path_2: List[Tuple[int, int]]) -> Tuple[int,
-                                                       Tuple[int, int],
-                                                       Tuple[int, int]]:
+def to_array(path: Union[Path, List[Tuple[int, int]]]) -> Path:
     """
-    This function calculates the shortest distance between 2 paths
+    This function converts a path to an array with a row per point
 
     Args:
-        path_1 (list[tuple[int, int]]): a path
-        path_2 (list[tuple[int, int]]): another path
+        path (Union[Path, List[Tuple[int, int]]]): a path
 
     Returns:
-        int: shortest Manhattan distance between the paths
+        Path: (N, 2) integer array with the points of the path
     """
 
-    min_dist: int = -1
+    return np.asarray(path, dtype=np.int64).reshape(-1, 2)
 
-    for point_1 in path_1:
-        for point_2 in path_2:
-            dist: int = dist_points(point_1, point_2)
 
-            # update data when new lowest distance is found
-            if dist < min_dist or min_dist == -1:
-                min_dist = dist
-                best_point_1 = point_1
-                best_point_2 = point_2
-
-    return min_dist, best_point_1, best_point_2
-
-
-def min_dist_paths(path: List[Tuple[int, int]], battery: Battery) -> int:
+def dist_paths(path_1: Union[Path, List[Tuple[int, int]]],
+               path_2: Union[Path, List[Tuple[int, int]]]
+               ) -> Tuple[int, int, int]:
     """
-    This function calculates the shortest distance between a path
-    and the path in battery
+    This function calculates the shortest distance between 2 paths by
+    broadcasting the Manhattan distance between all pairs of points
 
     Args:
-        path (list[tuple[int, int]]): a path
-        battery (Battery): a battery
+        path_1 (Union[Path, list[tuple[int, int]]]): a path
+        path_2 (Union[Path, list[tuple[int, int]]]): another path
 
     Returns:
-        int: shortest manhattan distance between path and the battery path
+        Tuple[int, int, int]: shortest Manhattan distance between the paths
+            and the indices of the closest points in both paths
     """
 
-    # initialize minimum distance
-    min_dist: int = -1
+    path_1, path_2 = to_array(path_1), to_array(path_2)
 
-    # find minimum distance between path and all other paths
-    for other_path in battery.copy_paths:
-        # mim distance between 2 paths
-        dist, point_1, point_2 = dist_paths(other_path, path)
+    # distances between all points of path_1 (rows) and path_2 (columns)
+    dists = np.abs(path_1[:, None, :] - path_2[None, :, :]).sum(axis=2)
 
-        # update minimum distance when new minimum is found
-        if min_dist == -1 or dist < min_dist:
-            min_dist = dist
+    # the first minimum, in the same order as looping over both paths
+    i, j = divmod(int(dists.argmin()), len(path_2))
 
-    return min_dist
+    return int(dists[i, j]), i, j
 
 
 def get_path(point_1: Tuple[int, int],
-             point_2: Tuple[int, int], info: bool) -> List[Tuple[int, int]]:
+             point_2: Tuple[int, int], info: bool) -> Path:
     """
     This function creates a path hor-ver or ver-hor depending on info
 
@@ -92,114 +68,362 @@ def get_path(point_1: Tuple[int, int],
         info (int): flag for which combination path
 
     Returns:
-        list[tuple[int, int]]: a path
+        Path: a path
     """
 
     # determine smallest and biggest x and y values
     small_x, small_y = min(point_1[0], point_2[0]), min(point_1[1], point_2[1])
     big_x, big_y = max(point_1[0], point_2[0]), max(point_1[1], point_2[1])
 
-    # create path
+    # the x value of the vertical part and the y value of the horizontal part
     if info:
-        vertical = [(point_1[0], i) for i in range(small_y, big_y + 1)]
-        horizonal = [(i, point_2[1]) for i in range(small_x, big_x + 1)]
-        return list(pd.unique(vertical + horizonal))
+        x, y = point_1[0], point_2[1]
+    else:
+        x, y = point_2[0], point_1[1]
+
+    # create path, the corner is only part of the vertical part
+    ys = np.arange(small_y, big_y + 1)
+    xs = np.arange(small_x, big_x + 1)
+    xs = xs[xs != x]
+    vertical = np.column_stack((np.full(len(ys), x), ys))
+    horizonal = np.column_stack((xs, np.full(len(xs), y)))
+
+    return np.concatenate((vertical, horizonal))
+
+
+class PathIndex:
+    """
+    Grid-bucket index over the points of the paths of a battery. Merged
+    paths get a new label, old labels point to it via union-find.
+    """
+    def __init__(self, paths: List[Union[Path, List[Tuple[int, int]]]]
+                 ) -> None:
+        """
+        Creates the index with a label for every path.
+
+        Args:
+            paths (List[Union[Path, List[Tuple[int, int]]]]): all paths of a
+                battery.
+        """
 
-    horizonal = [(i, point_1[1]) for i in range(small_x, big_x + 1)]
-    vertical = [(point_2[0], i) for i in range(small_y, big_y + 1)]
-    return list(pd.unique(vertical + horizonal))
+        # bucket -> label of a path -> points of the path in the bucket
+        self.buckets: Dict[Tuple[int, int],
+                           Dict[int, List[Tuple[int, int]]]] = {}
+
+        # label -> parent for merged labels
+        self.parent: Dict[int, int] = {}
+
+        # bounds of the used buckets
+        self.low: List[int] = []
+        self.high: List[int] = []
+
+        for label, path in enumerate(paths):
+            self.parent[label] = label
+            self.add_points(label, to_array(path))
+
+    def add_points(self, label: int, points: Path) -> None:
+        """
+        This function adds points of a path to the buckets
+
+        Args:
+            label (int): label of the path
+            points (Path): new points of the path
+        """
+
+        buckets = points // BUCKET_SIZE
+
+        # update the bounds of the used buckets
+        if not self.low:
+            self.low, self.high = [np.inf, np.inf], [-np.inf, -np.inf]
+        for k in range(2):
+            self.low[k] = min(self.low[k], int(buckets[:, k].min()))
+            self.high[k] = max(self.high[k], int(buckets[:, k].max()))
+
+        for point, bucket in zip(points.tolist(), buckets.tolist()):
+            self.buckets.setdefault(tuple(bucket), {}).setdefault(
+                label, []).append(point)
+
+    def find(self, label: int) -> int:
+        """
+        This function finds the current label of a (merged) path
+
+        Args:
+            label (int): a label
+
+        Returns:
+            int: the label of the path the label belongs to now
+        """
+
+        while self.parent[label] != label:
+            self.parent[label] = self.parent[self.parent[label]]
+            label = self.parent[label]
+
+        return label
+
+    def relabel(self, bucket: Tuple[int, int]
+                ) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        This function joins the points of merged paths in a bucket under
+        their current label, so a bucket is searched per path instead of
+        per point
+
+        Args:
+            bucket (Tuple[int, int]): a bucket
+
+        Returns:
+            Dict[int, List[Tuple[int, int]]]: current label of a path ->
+                points of the path in the bucket
+        """
+
+        labels = self.buckets.get(bucket)
+        if not labels:
+            return {}
+
+        for label in [label for label in labels
+                      if self.parent[label] != label]:
+            labels.setdefault(self.find(label), []).extend(labels.pop(label))
+
+        return labels
+
+    def merge(self, label_1: int, label_2: int, path: Path) -> int:
+        """
+        This function merges 2 paths and the path between them
+
+        Args:
+            label_1 (int): label of a path
+            label_2 (int): label of another path
+            path (Path): path between the 2 other paths
+
+        Returns:
+            int: label of the merged path
+        """
+
+        label = len(self.parent)
+        self.parent[label] = label
+        self.parent[label_1] = label
+        self.parent[label_2] = label
+
+        # only the path between them has new points
+        self.add_points(label, path)
+
+        return label
+
+    def extent(self) -> int:
+        """
+        This function gives the largest distance between 2 used buckets
+
+        Returns:
+            int: distance which no search has to go beyond
+        """
+
+        return int(self.high[0] - self.low[0] + self.high[1] -
+                   self.low[1] + 2) * BUCKET_SIZE
+
+    def nearest(self, points: Path, exclude: Set[int],
+                limit: Optional[int] = None
+                ) -> Optional[Tuple[int, Tuple[int, int], Tuple[int, int],
+                                    int]]:
+        """
+        This function finds the closest path to the points by searching
+        rings of buckets around the points
+
+        Args:
+            points (Path): points of a path
+            exclude (Set[int]): labels of paths that are not searched
+            limit (Optional[int]): stop searching when no path is at most
+                this far away, search all buckets if None
+
+        Returns:
+            Optional[Tuple[int, Tuple[int, int], Tuple[int, int], int]]:
+                the distance, the closest points and the label of the closest
+                path, None if there is no other path within the limit
+        """
+
+        best: Optional[Tuple[int, Tuple[int, int], Tuple[int, int],
+                             int]] = None
+
+        # start with the buckets of the points themselves
+        ring = set(map(tuple, (points // BUCKET_SIZE).tolist()))
+        seen = set(ring)
+        radius = 0
+
+        while ring:
+            # points of other paths in this ring of buckets
+            candidates: List[Tuple[int, int]] = []
+            owners: List[int] = []
+            for bucket in ring:
+                for label, bucket_points in self.relabel(bucket).items():
+                    if label not in exclude:
+                        candidates.extend(bucket_points)
+                        owners.extend([label] * len(bucket_points))
+
+            # update the closest path, the owner has the index of the point
+            if candidates:
+                dist, i, j = dist_paths(points, candidates)
+                if best is None or dist < best[0]:
+                    best = (dist, (int(points[i, 0]), int(points[i, 1])),
+                            tuple(candidates[j]), owners[j])
+
+            # points in the next ring are at least this far away
+            if best is not None and best[0] <= radius * BUCKET_SIZE:
+                break
+            if limit is not None and limit <= radius * BUCKET_SIZE:
+                return None
+
+            # grow the ring by 1 bucket within the used buckets
+            new_ring = set()
+            for x, y in ring:
+                for dx in (-1, 0, 1):
+                    for dy in (-1, 0, 1):
+                        bucket = (x + dx, y + dy)
+                        if (bucket not in seen and
+                           self.low[0] <= bucket[0] <= self.high[0] and
+                           self.low[1] <= bucket[1] <= self.high[1]):
+                            new_ring.add(bucket)
+                            seen.add(bucket)
+            ring = new_ring
+            radius += 1
+
+        return best
 
 
 def get_best_path(point_1: Tuple[int, int], point_2: Tuple[int, int],
-                  battery: Battery) -> List[Tuple[int, int]]:
+                  index: PathIndex, exclude: Set[int]) -> Path:
     """
     This function selects the best path out of the 2 options
 
     Args:
         point_1 (tuple[int, int]): a point
         point_2 (tuple[int, int]): another point
-        battery (Battery): a battery
+        index (PathIndex): index of the paths of the battery
+        exclude (Set[int]): labels of the paths that are merged
 
     Returns:
-        list[tuple[int, int]]: the best path
+        Path: the best path
     """
 
     # get both paths
     path_1 = get_path(point_1, point_2, True)
     path_2 = get_path(point_1, point_2, False)
 
+    # calculate the distances of both cases to the other paths, the second
+    # path is only better if it is at least as close
+    closest_1 = index.nearest(path_1, exclude)
+
     # if only 2 paths left, it doesn't matter which path we choose
-    if battery.get_len_paths() <= 2:
+    if closest_1 is None:
         return path_1
 
-    # calculate the distances of bothe cases
-    dist_1 = min_dist_paths(path_1, battery)
-    dist_2 = min_dist_paths(path_2, battery)
+    closest_2 = index.nearest(path_2, exclude, closest_1[0])
+    if closest_2 is None:
+        return path_1
 
     # return the smallest distance
-    if dist_1 < dist_2:
+    if closest_1[0] < closest_2[0]:
         return path_1
     return path_2
 
 
-def merge_paths(battery: Battery, index_1: int, index_2: int,
-                path: List[Tuple[int, int]]) -> None:
+def merged_path(paths: List[Union[Path, List[Tuple[int, int]]]]
+                ) -> List[Tuple[int, int]]:
     """
-    merges 3 paths to 1
+    This function keeps merging the closest 2 paths until 1 path remains,
+    without changing the given paths. Every given path and every connection
+    keeps its closest other path in a heap. A merge only searches from the
+    points of the new connection, the other entries stay valid as long as
+    their closest path is not merged into their own path.
 
     Args:
-        battery (Battery): a battery
-        index_1 (int): index of a path
-        index_2 (int): index of another path
-        path (List[Tuple[int, int]]): path between the 2 other paths
-    """
-
-    # combine both paths and remove duplicates
-    battery.all_paths[index_2] += battery.all_paths[index_1] + path
-
-    # delete the old path
-    del battery.all_paths[index_1]
+        paths (List[Union[Path, List[Tuple[int, int]]]]): all paths of a
+            battery
 
-    # copy path
-    battery.copy_paths = copy.deepcopy(battery.all_paths)
-
-
-def create_merged_path(battery: Battery) -> None:
+    Returns:
+        List[Tuple[int, int]]: all unique points of the merged path
     """
-    This function creates a merged path
 
-    Args:
-        battery (Battery): a battery
+    index = PathIndex(paths)
+    remaining: int = len(paths)
+
+    # the given paths and the connections, with the label they started with
+    pieces: List[Path] = [to_array(path) for path in paths]
+    starts: List[int] = list(range(len(paths)))
+
+    # heap with the closest other path of every piece, or with a lower
+    # bound of the distance and no path if the search stopped at a limit
+    heap: List[Tuple[int, int, Tuple[int, int], Tuple[int, int], int]] = []
+
+    def push(piece: int, limit: Optional[int] = None) -> None:
+        if limit is not None and limit >= index.extent():
+            limit = None
+        closest = index.nearest(pieces[piece],
+                                {index.find(starts[piece])}, limit)
+        if closest is not None:
+            dist, point_1, point_2, other = closest
+            heapq.heappush(heap, (dist, piece, point_1, point_2, other))
+        elif limit is not None:
+            heapq.heappush(heap, (limit + 1, piece, (0, 0), (0, 0), -1))
+
+    for piece in range(len(paths)):
+        push(piece)
+
+    while remaining > 1:
+        dist, piece, point_1, point_2, other = heapq.heappop(heap)
+        label_1 = index.find(starts[piece])
+
+        # search again if the closest path has been merged with this path,
+        # or further if only a lower bound is known, a path further away
+        # than twice the closest distance is not needed soon
+        if other < 0 or label_1 == index.find(other):
+            push(piece, max(2 * dist, BUCKET_SIZE))
+            continue
+        label_2 = index.find(other)
+
+        # get best path between the found closest paths
+        path = get_best_path(point_1, point_2, index, {label_1, label_2})
+
+        # now connect the paths together and search from the connection
+        pieces.append(path)
+        starts.append(index.merge(label_1, label_2, path))
+        push(len(pieces) - 1, max(2 * dist, BUCKET_SIZE))
+        remaining -= 1
+
+    # remove duplicates
+    return CellSet.from_array(np.concatenate(pieces)).to_list()
+
+
+def route_cables(paths: List[List[Tuple[int, int]]],
+                 budget: float = STEINER_BUDGET,
+                 merged: Optional[List[Tuple[int, int]]] = None,
+                 rounds: Optional[int] = STEINER_ROUNDS
+                 ) -> List[Tuple[int, int]]:
     """
+    This function connects the paths by merging them and by routing a
+    Steiner tree through their points, and keeps the tree with the fewest
+    cables
 
-    min_dist: int = -1
-
-    for i, path_1 in enumerate(battery.all_paths):
-        # stop at last path
-        if i == battery.get_len_paths() - 1:
-            break
-
-        for not_j, path_2 in enumerate(battery.all_paths[i + 1:]):
-            # index for second path in self.all_paths
-            j: int = not_j + i + 1
+    Args:
+        paths (List[List[Tuple[int, int]]]): the paths of a battery
+        budget (float): most seconds to search Steiner points, 0 to only
+            merge
+        merged (Optional[List[Tuple[int, int]]]): the merged path if it is
+            known already
+        rounds (Optional[int]): rounds to search Steiner points, no limit
+            if None, 0 to only merge
 
-            # find the indexes of closest points of 2 paths and the distance
-            dist, point_1, point_2 = dist_paths(path_1, path_2)
+    Returns:
+        List[Tuple[int, int]]: all unique points of the shortest tree
+    """
 
-            # update data if new minimum is found
-            if min_dist == -1 or dist < min_dist:
-                min_dist = dist
-                index_1 = i
-                index_2 = j
-                best_point_1 = point_1
-                best_point_2 = point_2
+    if merged is None:
+        merged = merged_path(paths)
 
-    # remove the chosen paths oout of the copy list
-    battery.copy_paths.pop(index_2)
-    battery.copy_paths.pop(index_1)
+    if budget <= 0 or rounds == 0:
+        return merged
 
-    # get best path between the found closest paths
-    path = get_best_path(best_point_1, best_point_2, battery)
+    routed = steiner_path([point for path in paths for point in path],
+                          budget, rounds)
 
-    # now connect the paths together
-    merge_paths(battery, index_1, index_2, path)
+    # the merged path when the budget ran out
+    if routed is None or len(routed) >= len(merged):
+        return merged
+    return routed
@@ -0,0 +1,103 @@
+"""
+This program samples random compositions of a district with numpy to get
+the baseline distribution of the costs without creating any agents
+"""
+
+from Additional_code.district import (BATTERY_COSTS, CABLE_COSTS,
+                                      DistrictKey, read_district)
+from typing import Tuple, Union
+import numpy as np
+
+
+def sample_batch(house_points: np.ndarray, outputs: np.ndarray,
+                 battery_points: np.ndarray, capacities: np.ndarray,
+                 trials: int, rng: np.random.Generator
+                 ) -> Tuple[np.ndarray, int]:
+    """
+    This function samples random compositions the same way as the baseline
+    model: the houses are shuffled and every house connects to a random
+    battery, or the next battery with enough capacity. If a house fits in
+    no battery the composition fails. Every house has its own cable, so the
+    cables of a house are its Manhattan distance to the battery plus 1.
+
+    Args:
+        house_points (np.ndarray): (H, 2) coordinates of the houses
+        outputs (np.ndarray): (H,) outputs of the houses
+        battery_points (np.ndarray): (B, 2) coordinates of the batteries
+        capacities (np.ndarray): (B,) capacities of the batteries
+        trials (int): number of random compositions
+        rng (np.random.Generator): random generator
+
+    Returns:
+        Tuple[np.ndarray, int]: costs of the successful compositions and the
+            number of failed compositions
+    """
+
+    num_houses, num_batteries = len(house_points), len(battery_points)
+    trial_index = np.arange(trials)
+
+    # cables from every house to every battery
+    cables = np.abs(house_points[:, None, :] -
+                    battery_points[None, :, :]).sum(axis=2) + 1
+
+    # a random order of the houses and random start batteries for every
+    # trial, a row per step
+    order = rng.permuted(np.tile(np.arange(num_houses), (trials, 1)),
+                         axis=1).T.copy()
+    starts = rng.integers(num_batteries, size=(num_houses, trials))
+
+    # remaining capacity with a row per battery and a column per trial
+    remaining = np.repeat(capacities.astype(float)[:, None], trials, axis=1)
+    num_cables = np.zeros(trials, dtype=np.int64)
+    failed = np.zeros(trials, dtype=bool)
+
+    for step in range(num_houses):
+        house, start = order[step], starts[step]
+        output = outputs[house]
+
+        # the first battery with enough capacity, counting from the start
+        first = np.full(trials, num_batteries)
+        for battery in range(num_batteries):
+            rank = battery - start
+            rank += num_batteries * (rank < 0)
+            first = np.minimum(first, np.where(remaining[battery] >= output,
+                                               rank, num_batteries))
+
+        # the composition fails if the house fits nowhere
+        failed |= first == num_batteries
+        chosen = (start + first) % num_batteries
+        output = np.where(failed, 0, output)
+
+        # connect the house in the compositions that did not fail
+        remaining[chosen, trial_index] -= output
+        num_cables += cables[house, chosen]
+
+    costs = (num_cables[~failed] * CABLE_COSTS +
+             num_batteries * BATTERY_COSTS)
+
+    return costs, int(failed.sum())
+
+
+def sample_chunk(district: DistrictKey, trials: int,
+                 seed: Union[int, np.random.SeedSequence, None] = None
+                 ) -> Tuple[np.ndarray, int]:
+    """
+    This function samples a chunk of the baseline of version 1 with its own
+    random stream
+
+    Args:
+        district (DistrictKey): district number or path
+        trials (int): number of random compositions
+        seed (Union[int, np.random.SeedSequence, None]): seed of the random
+            stream, random if None
+
+    Returns:
+        Tuple[np.ndarray, int]: costs of the successful compositions and the
+            number of failed compositions
+    """
+
+    house_points, outputs, battery_points, capacities = read_district(
+        district)
+
+    return sample_batch(house_points, outputs, battery_points, capacities,
+                        trials, np.random.default_rng(seed))
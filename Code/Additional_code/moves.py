@@ -0,0 +1,347 @@
+"""
+This program has the moves which change a composition during the
+optimization and the generator which chooses between them. The generator
+gives the moves that improve the costs more often a higher chance, and
+keeps the statistics of every move.
+"""
+
+from __future__ import annotations
+from Additional_code.annealing_state import AnnealingState
+from typing import Any, Dict, Final, List, Optional, Sequence, Tuple
+import numpy as np
+import random
+
+# tries of a move to find a change that fits in the batteries
+ATTEMPTS: Final = 10
+
+# number of houses closest to a cable tree from which a cable move picks
+CLOSEST: Final = 5
+
+# proposals between updates of the chances, the part of the chance that
+# comes from the last period and the smallest chance of a move
+PERIOD: Final = 100
+REACTION: Final = 0.2
+MIN_WEIGHT: Final = 0.05
+
+# scores of a proposal: new best costs, better costs, accepted and rejected
+SCORES: Final = (3.0, 2.0, 1.0, 0.0)
+
+# a change of a composition: pairs of house and new battery
+Change = List[Tuple[int, int]]
+
+
+class Move:
+    """
+    Random change of a composition that fits in the batteries
+    """
+    def propose(self, state: AnnealingState) -> Optional[Change]:
+        """
+        This function tries to find a change that fits in the batteries
+
+        Args:
+            state (AnnealingState): the current composition
+
+        Returns:
+            Optional[Change]: the change, None if no change has been found
+        """
+
+        for _ in range(ATTEMPTS):
+            change = self.attempt(state)
+            if change is not None:
+                return change
+
+        return None
+
+    def attempt(self, state: AnnealingState) -> Optional[Change]:
+        """
+        This function tries once to find a change
+
+        Args:
+            state (AnnealingState): the current composition
+
+        Returns:
+            Optional[Change]: the change, None if it does not fit
+        """
+
+        raise NotImplementedError
+
+
+class SwapMove(Move):
+    """
+    Switches the batteries of 2 random houses of different batteries
+    """
+    def attempt(self, state: AnnealingState) -> Optional[Change]:
+        batteries = [battery for battery, members in enumerate(state.members)
+                     if members]
+        if len(batteries) < 2:
+            return None
+
+        # select 2 different random batteries and a random house of both
+        battery_1, battery_2 = random.sample(batteries, 2)
+        house_1 = random.choice(state.members[battery_1])
+        house_2 = random.choice(state.members[battery_2])
+
+        # skip if not enough capacity in the batteries
+        if (not state.fits(house_1, battery_2, state.house_energy[house_2]) or
+           not state.fits(house_2, battery_1, state.house_energy[house_1])):
+            return None
+
+        return [(house_1, battery_2), (house_2, battery_1)]
+
+
+class RelocateMove(Move):
+    """
+    Moves a random house to another battery with enough capacity left
+    """
+    def attempt(self, state: AnnealingState) -> Optional[Change]:
+        house = random.randrange(len(state.assignment))
+        batteries = [battery for battery in range(len(state.members))
+                     if battery != state.assignment[house] and
+                     state.fits(house, battery)]
+        if not batteries:
+            return None
+
+        return [(house, random.choice(batteries))]
+
+
+class EjectionMove(Move):
+    """
+    Moves a random house to another battery, and when it does not fit a
+    house of that battery is ejected to a third battery to make room
+    """
+    def attempt(self, state: AnnealingState) -> Optional[Change]:
+        if len(state.members) < 2:
+            return None
+
+        house = random.randrange(len(state.assignment))
+        old = state.assignment[house]
+        battery = random.choice([other for other in range(len(state.members))
+                                 if other != old])
+
+        if state.fits(house, battery):
+            return [(house, battery)]
+
+        # the houses which make enough room when they leave
+        energy = state.house_energy
+        ejected = [other for other in state.members[battery]
+                   if state.fits(house, battery, energy[other])]
+        random.shuffle(ejected)
+
+        for other in ejected:
+            # the old battery gets the room of the house
+            targets = [target for target in range(len(state.members))
+                       if target != battery and
+                       state.fits(other, target,
+                                  energy[house] if target == old else 0)]
+            if targets:
+                return [(house, battery), (other, random.choice(targets))]
+
+        return None
+
+
+class CableMove(Move):
+    """
+    Moves a house that is close to the cables of another battery to that
+    battery, swapped with a house of that battery if it does not fit
+    """
+    def __init__(self) -> None:
+        self.points: Optional[np.ndarray] = None
+
+    def attempt(self, state: AnnealingState) -> Optional[Change]:
+        if len(state.members) < 2:
+            return None
+        if self.points is None:
+            self.points = np.array(state.house_points)
+
+        # the cable tree of a random battery, from the cache of the state
+        battery = random.randrange(len(state.members))
+        tree = np.array(state.cache.merged_path(state.battery_points[battery],
+                                                state.members[battery],
+                                                state.house_points))
+
+        # a random house of the houses of other batteries closest to the tree
+        houses = np.flatnonzero(np.array(state.assignment) != battery)
+        if len(houses) == 0:
+            return None
+        distances = np.abs(self.points[houses, None, :] -
+                           tree[None, :, :]).sum(axis=2).min(axis=1)
+        closest = np.argsort(distances, kind='stable')[:CLOSEST]
+        house = int(houses[random.choice(closest.tolist())])
+
+        if state.fits(house, battery):
+            return [(house, battery)]
+
+        # swap with a house of the battery that makes room
+        old, energy = state.assignment[house], state.house_energy
+        others = [other for other in state.members[battery]
+                  if state.fits(house, battery, energy[other]) and
+                  state.fits(other, old, energy[house])]
+        if not others:
+            return None
+
+        return [(house, battery), (random.choice(others), old)]
+
+
+# all moves by name
+MOVES: Final[Dict[str, type]] = {
+    "swap": SwapMove,
+    "relocate": RelocateMove,
+    "ejection": EjectionMove,
+    "cable": CableMove,
+}
+
+
+class MoveGenerator:
+    """
+    Chooses the moves with a roulette wheel. Every period the chance of a
+    move is updated with the mean score of its proposals, so the moves that
+    pay off are proposed more often.
+    """
+    def __init__(self, names: Optional[Sequence[str]] = None,
+                 period: int = PERIOD, reaction: float = REACTION) -> None:
+        """
+        Creates a generator with the same chance for every move.
+
+        Args:
+            names (Optional[Sequence[str]]): names of the moves, keys of
+                MOVES, all moves if None.
+            period (int): proposals between updates of the chances.
+            reaction (float): part of the chance from the last period.
+        """
+
+        names = list(MOVES) if names is None else list(names)
+        self.moves: Dict[str, Move] = {name: MOVES[name]() for name in names}
+        self.weights: Dict[str, float] = dict.fromkeys(names, 1.0)
+        self.period = period
+        self.reaction = reaction
+
+        # scores and uses of every move in the current period
+        self.scores: Dict[str, float] = dict.fromkeys(names, 0.0)
+        self.uses: Dict[str, int] = dict.fromkeys(names, 0)
+        self.proposals = 0
+
+        # statistics of every move over the whole optimization
+        self.statistics: Dict[str, Dict[str, int]] = {
+            name: {"proposed": 0, "failed": 0, "accepted": 0, "improved": 0,
+                   "best": 0}
+            for name in names}
+
+    def propose(self, state: AnnealingState) -> Tuple[str, Optional[Change]]:
+        """
+        This function chooses a move and lets it propose a change
+
+        Args:
+            state (AnnealingState): the current composition
+
+        Returns:
+            Tuple[str, Optional[Change]]: name of the move and the change,
+                None if the move found no change that fits
+        """
+
+        names = list(self.moves)
+        name = random.choices(names, [self.weights[name] for name in names])[0]
+        change = self.moves[name].propose(state)
+
+        self.statistics[name]["proposed"] += 1
+        if change is None:
+            self.statistics[name]["failed"] += 1
+            self.record(name, SCORES[3])
+
+        return name, change
+
+    def evaluate(self, name: str, accepted: bool, improved: bool,
+                 best: bool) -> None:
+        """
+        This function scores the change of a move
+
+        Args:
+            name (str): name of the move
+            accepted (bool): whether the change is accepted
+            improved (bool): whether the change lowered the costs
+            best (bool): whether the change found new best costs
+        """
+
+        statistics = self.statistics[name]
+        statistics["accepted"] += accepted
+        statistics["improved"] += improved
+        statistics["best"] += best
+
+        if best:
+            self.record(name, SCORES[0])
+        elif improved:
+            self.record(name, SCORES[1])
+        elif accepted:
+            self.record(name, SCORES[2])
+        else:
+            self.record(name, SCORES[3])
+
+    def record(self, name: str, score: float) -> None:
+        """
+        This function adds the score of a proposal and updates the chances
+        at the end of a period
+
+        Args:
+            name (str): name of the move
+            score (float): score of the proposal
+        """
+
+        self.scores[name] += score
+        self.uses[name] += 1
+        self.proposals += 1
+
+        if self.proposals % self.period:
+            return
+
+        # the mean score of the period, moves that were not used keep
+        # their chance
+        for move in self.moves:
+            if self.uses[move]:
+                mean = self.scores[move] / self.uses[move]
+                self.weights[move] = max((1 - self.reaction) *
+                                         self.weights[move] +
+                                         self.reaction * mean, MIN_WEIGHT)
+            self.scores[move], self.uses[move] = 0.0, 0
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """
+        This function gives the state of the generator for a checkpoint
+
+        Returns:
+            Dict[str, Any]: the chances, scores and statistics of the moves
+        """
+
+        return {"weights": self.weights, "scores": self.scores,
+                "uses": self.uses, "proposals": self.proposals,
+                "statistics": self.statistics}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """
+        This function continues the generator from a checkpoint
+
+        Args:
+            state (Dict[str, Any]): the state of the generator
+        """
+
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """
+        This function gives the statistics and the chance of every move
+
+        Returns:
+            Dict[str, Dict[str, float]]: the counts, acceptance rate and
+                chance of every move
+        """
+
+        total = sum(self.weights.values())
+        report: Dict[str, Dict[str, float]] = {}
+
+        for name, statistics in self.statistics.items():
+            tried = statistics["proposed"] - statistics["failed"]
+            report[name] = {**statistics,
+                            "acceptance": (statistics["accepted"] / tried
+                                           if tried else 0.0),
+                            "chance": self.weights[name] / total}
+
+        return report
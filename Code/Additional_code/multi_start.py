@@ -0,0 +1,136 @@
+"""
+This program runs independent simulated annealing chains in parallel and
+keeps the best smartgrid
+"""
+
+from Additional_code.district import DistrictKey
+from Additional_code.steiner import STEINER_BUDGET, STEINER_ROUNDS
+from Additional_code.trace import TRACE
+from Additional_code.tree_cache import TREE_CACHE_SIZE
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import random
+import mesa
+import numpy as np
+import os
+
+
+def run_chain(model: type, district: DistrictKey, iterations: int, seed: int,
+              schedule: str, linking: str = 'greedy',
+              budget: float = STEINER_BUDGET,
+              cache_size: int = TREE_CACHE_SIZE,
+              moves: Optional[List[str]] = None,
+              steiner_rounds: Optional[int] = STEINER_ROUNDS,
+              trace: Optional[str] = None,
+              trace_every: int = 1, cprofile: bool = False,
+              memory: bool = False) -> Tuple[int, mesa.Model]:
+    """
+    This function runs 1 simulated annealing chain. The seed determines the
+    random start composition and the random switches of the chain.
+
+    Args:
+        model (type): the SmartGrid class
+        district (DistrictKey): district number or path
+        iterations (int): number of iterations
+        seed (int): seed of the chain
+        schedule (str): name of the cooling schedule
+        linking (str): way to link the houses to the batteries
+        budget (float): most seconds to search a Steiner tree per battery
+        cache_size (int): number of merged cable trees to remember
+        moves (Optional[List[str]]): moves of the optimization, all if None
+        steiner_rounds (Optional[int]): rounds to search a Steiner tree per
+            battery, no limit if None
+        trace (Optional[str]): path of the costs of the chain
+        trace_every (int): iterations between rows of the trace
+        cprofile (bool): whether to profile the functions with cProfile
+        memory (bool): whether to measure the peak memory of the stages
+
+    Returns:
+        Tuple[int, mesa.Model]: costs of the chain and its smartgrid
+    """
+
+    random.seed(seed)
+    smartgrid = model(district, 'simulated annealing', iterations,
+                      schedule=schedule, linking=linking, budget=budget,
+                      cache_size=cache_size, moves=moves,
+                      steiner_rounds=steiner_rounds, trace=trace,
+                      trace_every=trace_every, cprofile=cprofile,
+                      memory=memory)
+
+    return smartgrid.costs(), smartgrid
+
+
+def multi_start(model: type, district: DistrictKey, iterations: int,
+                chains: int, workers: Optional[int] = None,
+                seed: Optional[int] = None,
+                schedule: str = 'geometric',
+                linking: str = 'greedy',
+                budget: float = STEINER_BUDGET,
+                cache_size: int = TREE_CACHE_SIZE,
+                moves: Optional[List[str]] = None,
+                steiner_rounds: Optional[int] = STEINER_ROUNDS,
+                trace: str = TRACE,
+                trace_every: int = 1,
+                cprofile: bool = False,
+                memory: bool = False
+                ) -> Tuple[mesa.Model, List[str]]:
+    """
+    This function runs several simulated annealing chains in parallel, each
+    with a different seed, and returns the best smartgrid. With exact
+    linking every chain starts from the same optimal assignment, so the
+    chains only differ in their random moves.
+
+    Args:
+        model (type): the SmartGrid class
+        district (DistrictKey): district number or path
+        iterations (int): number of iterations of every chain
+        chains (int): number of chains
+        workers (Optional[int]): number of processes, all cores if None
+        seed (Optional[int]): seed from which the seeds of the chains are
+            derived, random if None
+        schedule (str): name of the cooling schedule
+        linking (str): way to link the houses to the batteries
+        budget (float): most seconds to search a Steiner tree per battery
+        cache_size (int): number of merged cable trees to remember
+        moves (Optional[List[str]]): moves of the optimization, all if None
+        steiner_rounds (Optional[int]): rounds to search a Steiner tree per
+            battery, no limit if None
+        trace (str): path of the costs, every chain writes its costs to this
+            path with the number of the chain
+        trace_every (int): iterations between rows of the traces
+        cprofile (bool): whether to profile the functions with cProfile
+        memory (bool): whether to measure the peak memory of the stages
+
+    Returns:
+        Tuple[mesa.Model, List[str]]: the best smartgrid and the paths of
+            the traces of the chains
+    """
+
+    # every chain gets an independent stream, so the chains of different
+    # seeds do not overlap
+    if seed is None:
+        seed = random.randrange(2**32)
+    seeds = [int(stream.generate_state(1)[0])
+             for stream in np.random.SeedSequence(seed).spawn(chains)]
+
+    # every chain streams its costs to its own trace
+    root, extension = os.path.splitext(trace)
+    traces = [f"{root}_chain{chain}{extension}" for chain in range(chains)]
+
+    # run the chains in parallel
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_chain, model, district, iterations,
+                                   chain_seed, schedule=schedule,
+                                   linking=linking, budget=budget,
+                                   cache_size=cache_size, moves=moves,
+                                   steiner_rounds=steiner_rounds,
+                                   trace=chain_trace,
+                                   trace_every=trace_every,
+                                   cprofile=cprofile, memory=memory)
+                   for chain_seed, chain_trace in zip(seeds, traces)]
+        results = [future.result() for future in futures]
+
+    # keep the smartgrid with the lowest costs
+    costs, best = min(results, key=lambda result: result[0])
+
+    return best, traces
@@ -4,11 +4,9 @@ using density-based clustering
 """
 
 from sklearn.cluster import KMeans
-from Agents.battery import Battery
-from Agents.house import House
-from typing import List, Final
+from Additional_code.district import District
+from typing import List, Final, Set, Tuple
 import numpy as np
-import pandas as pd
 
 # ! data of the different batteries in format ([capacity], [costs])
 BIG_BAT_DAT: Final = (1800, 1800)
@@ -16,12 +14,13 @@ MID_BAT_DAT: Final = (900, 1350)
 LOW_BAT_DAT: Final = (450, 900)
 
 
-def check_point_in_df(houses_list: List[Battery], x: int, y: int) -> bool:
+def check_point_in_df(occupied: Set[Tuple[int, int]], x: int, y: int
+                      ) -> bool:
     """
-    This function checks if (x, y) is in the dataframe
+    This function checks if (x, y) is occupied by a house
 
     Args:
-        dataframe (pd.DataFrame): a dataframe with data houses
+        occupied (Set[Tuple[int, int]]): coordinates of all houses
         x (int): x value in grid
         y (int): y value in grid
 
@@ -29,81 +28,116 @@ def check_point_in_df(houses_list: List[Battery], x: int, y: int) -> bool:
         bool: True if a house is placed at (x, y) else False
     """
 
-    for house in houses_list:
-        if house.x == x and house.y == y:
-            return True
+    return (x, y) in occupied
 
-    return False
 
+def cluster_outputs(district: District, labels: np.ndarray,
+                    num_clust: int) -> np.ndarray:
+    """
+    This function sums the outputs of the houses of every cluster
+
+    Args:
+        district (District): district with the houses
+        labels (np.ndarray): (H,) cluster of every house
+        num_clust (int): number of clusters
 
-def cluster_funct(houses_list: List[House]) -> List[Battery]:
+    Returns:
+        np.ndarray: (num_clust,) total output of every cluster
     """
-    This function makes clusters
+
+    return np.bincount(labels, weights=district.house_output,
+                       minlength=num_clust)
+
+
+def find_clusters(district: District) -> np.ndarray:
+    """
+    This function finds the fewest clusters with K-means for which every
+    cluster has less output than the big battery capacity. Fewer clusters
+    than the total output divided by that capacity can never fit, so the
+    search starts there. While a cluster is too big, the biggest cluster is
+    split in 2 and all clusters are fitted again starting from the current
+    centres.
 
     Args:
-        houses_list (List[House]): all houses
+        district (District): district with the houses
 
     Returns:
-        List[Battery]: list of placed batteries
+        np.ndarray: (H,) cluster of every house
     """
 
-    # initiate battery list
-    battery_lst: List[Battery] = []
+    X = district.house_points()
+
+    # the fewest clusters that could fit in big batteries
+    num_clust = int(np.ceil(district.house_output.sum() / BIG_BAT_DAT[0]))
+    num_clust = min(max(num_clust, 1), len(X))
+    clustering = KMeans(n_clusters=num_clust, n_init=10,
+                        random_state=0).fit(X)
+
+    # * stop if all the clusters are less then big battery capacity
+    while (cluster_outputs(district, clustering.labels_, num_clust).max() >=
+           BIG_BAT_DAT[0] and num_clust < len(X)):
+        # split the biggest cluster in 2
+        biggest = int(np.argmax(cluster_outputs(district, clustering.labels_,
+                                                num_clust)))
+        members = X[clustering.labels_ == biggest]
+        halves = KMeans(n_clusters=2, n_init=10,
+                        random_state=0).fit(members).cluster_centers_
+
+        # fit all clusters again from the current centres
+        centres = np.concatenate((np.delete(clustering.cluster_centers_,
+                                            biggest, axis=0), halves))
+        num_clust += 1
+        clustering = KMeans(n_clusters=num_clust, init=centres,
+                            n_init=1).fit(X)
+
+    return clustering.labels_
 
-    # make a dataset with the house locations
-    X = []
-    for house in houses_list:
-        X.append([house.x, house.y])
 
-    # initialize highest total cluster output and number of clusters
-    num_clust: int = 1
+def cluster_funct(district: District) -> District:
+    """
+    This function makes clusters
 
-    # convert to 2D numpy array
-    X = np.array(X)
+    Args:
+        district (District): district with the houses
 
-    while True:
-        # run K-means on X
-        clustering = KMeans(n_clusters=num_clust, random_state=0).fit(X)
+    Returns:
+        District: the district with the placed batteries
+    """
 
-        # create pandas dataframe with the data
-        data = pd.DataFrame()
-        data['x'] = [house.x for house in houses_list]
-        data['y'] = [house.y for house in houses_list]
-        data['output'] = [house.energy for house in houses_list]
-        data['cluster'] = clustering.labels_
+    # initiate battery points, capacities and costs
+    points: List[List[int]] = []
+    capacities: List[int] = []
+    costs: List[int] = []
 
-        # * stop loop if all the clusters are less then big battery capacity
-        for i in data['cluster']:
-            # filter the data by cluster
-            filter_data = data[data.cluster == i]
-            cluster_output = filter_data['output'].sum()
+    labels = find_clusters(district)
+    num_clust = int(labels.max()) + 1
 
-            # stop for loop when too high a cluster_output has been found
-            if cluster_output >= BIG_BAT_DAT[0]:
-                break
-        else:
-            break
+    # output and centre of every cluster
+    outputs = cluster_outputs(district, labels, num_clust)
+    sizes = np.bincount(labels, minlength=num_clust)
+    mean_x = np.bincount(labels, weights=district.house_x,
+                         minlength=num_clust) / np.maximum(sizes, 1)
+    mean_y = np.bincount(labels, weights=district.house_y,
+                         minlength=num_clust) / np.maximum(sizes, 1)
 
-        # update number of clusters
-        num_clust += 1
+    # coordinates of all houses
+    occupied = set(zip(district.house_x.tolist(), district.house_y.tolist()))
 
-    # definte the unique clusters
-    unique_clusters = data['cluster'].unique()
+    # the clusters in order of their first house
+    _, first = np.unique(labels, return_index=True)
+    unique_clusters = labels[np.sort(first)]
 
     # create sorted clusters by total output batteries
     for i in unique_clusters:
-        # filter the data by cluster
-        filter_data = data[data.cluster == i]
-
         # calculate the output sum
-        cluster_output = filter_data['output'].sum()
+        cluster_output = outputs[i]
 
         # calculate centre point
-        centre_x = round(filter_data['x'].mean())
-        centre_y = round(filter_data['y'].mean())
+        centre_x = round(float(mean_x[i]))
+        centre_y = round(float(mean_y[i]))
 
         # variable which checks if the centre points are in filter_data
-        point_in_df: bool = check_point_in_df(houses_list, centre_x, centre_y)
+        point_in_df: bool = check_point_in_df(occupied, centre_x, centre_y)
 
         # check surrounding points if that is empty if so, edit centre points
         if point_in_df:
@@ -111,29 +145,30 @@ def cluster_funct(houses_list: List[House]) -> List[Battery]:
             for x in range(centre_x - 1, centre_x + 2):
                 for y in range(centre_y - 1, centre_y + 2):
                     # check centre point
-                    new_point_in_df = check_point_in_df(houses_list, x, y)
+                    new_point_in_df = check_point_in_df(occupied, x, y)
                     if not new_point_in_df:
                         centre_x, centre_y = x, y
 
         # edit cluster output when at last
         if i == unique_clusters[-1]:
             # house and battery energy levels
-            house_output = sum([house.energy for house in houses_list])
-            battery_capacity = sum([battery.capacity
-                                    for battery in battery_lst])
+            house_output = district.house_output.sum()
+            battery_capacity = sum(capacities)
 
             # modify cluster output
             cluster_output = house_output - battery_capacity
 
         # create batteries
         if cluster_output > MID_BAT_DAT[0]:
-            battery_lst.append(Battery(i, i, centre_x, centre_y,
-                                       BIG_BAT_DAT[0], BIG_BAT_DAT[1]))
+            capacity, battery_costs = BIG_BAT_DAT
         elif cluster_output > LOW_BAT_DAT[0]:
-            battery_lst.append(Battery(i, i, centre_x, centre_y,
-                                       MID_BAT_DAT[0], MID_BAT_DAT[1]))
+            capacity, battery_costs = MID_BAT_DAT
         else:
-            battery_lst.append(Battery(i, i, centre_x, centre_y,
-                                       LOW_BAT_DAT[0], LOW_BAT_DAT[1]))
+            capacity, battery_costs = LOW_BAT_DAT
+
+        points.append([centre_x, centre_y])
+        capacities.append(capacity)
+        costs.append(battery_costs)
 
-    return battery_lst
+    return district.with_batteries(np.array(points), np.array(capacities),
+                                   np.array(costs))
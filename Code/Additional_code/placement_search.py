@@ -0,0 +1,215 @@
+"""
+This program searches the types, number and locations of the batteries of
+the advanced version together. A placement is scored with a fast cost model:
+the houses are linked to the closest battery with room, and the cables of a
+battery are estimated by the rectilinear minimum spanning tree of the
+battery and its houses. Every round a batch of neighbouring placements is
+scored in parallel and the best one is kept if it is cheaper.
+"""
+
+from Additional_code.distribute import distribute, link_closest
+from Additional_code.district import CABLE_COSTS, District
+from Additional_code.place_battery import (BIG_BAT_DAT, MID_BAT_DAT,
+                                           LOW_BAT_DAT)
+from Additional_code.steiner import mst_weights
+from concurrent.futures import ProcessPoolExecutor
+from typing import Final, List, Optional, Set, Tuple
+import itertools
+import numpy as np
+import random
+
+# the types of batteries in format (capacity, costs)
+BATTERY_TYPES: Final = (BIG_BAT_DAT, MID_BAT_DAT, LOW_BAT_DAT)
+
+# default number of rounds, placements per round and rounds without
+# improvement before the search stops
+ROUNDS: Final = 100
+NEIGHBOURS: Final = 8
+PATIENCE: Final = 20
+
+# furthest a battery moves in 1 step
+STEP: Final = 3
+
+# changes of a placement
+MOVES: Final = ['shift', 'type', 'remove', 'add']
+
+# a placement is the x, y and index of the type of every battery
+Placement = Tuple[Tuple[int, int, int], ...]
+
+
+def placement_of(district: District) -> Placement:
+    """
+    This function gives the placement of the batteries of a district
+
+    Args:
+        district (District): district with batteries of BATTERY_TYPES
+
+    Returns:
+        Placement: the placement of the batteries
+    """
+
+    capacities = [capacity for capacity, _ in BATTERY_TYPES]
+
+    return tuple((int(x), int(y), capacities.index(capacity))
+                 for x, y, capacity in zip(district.battery_x,
+                                           district.battery_y,
+                                           district.capacity))
+
+
+def place(district: District, placement: Placement) -> District:
+    """
+    This function creates a district with the batteries of a placement
+
+    Args:
+        district (District): district with the houses
+        placement (Placement): the placement of the batteries
+
+    Returns:
+        District: the district without connections
+    """
+
+    points = np.array([[x, y] for x, y, _ in placement])
+    capacities = np.array([BATTERY_TYPES[kind][0] for _, _, kind in placement])
+    costs = np.array([BATTERY_TYPES[kind][1] for _, _, kind in placement])
+
+    return district.with_batteries(points, capacities, costs)
+
+
+def estimate_costs(district: District, placement: Placement) -> float:
+    """
+    This function estimates the costs of a placement. The houses are linked
+    as in the advanced version and every battery gets the cables of the
+    minimum spanning tree of its houses, without the cables that shared
+    paths save.
+
+    Args:
+        district (District): district with the houses
+        placement (Placement): the placement of the batteries
+
+    Returns:
+        float: estimated costs, infinite if the houses do not fit
+    """
+
+    placed = place(district, placement)
+    if placed.capacity.sum() < placed.house_output.sum():
+        return np.inf
+
+    # link the houses with the largest regret first
+    order = np.argsort(-placed.regret(), kind='stable').tolist()
+    not_placed = link_closest(placed, order)
+    if not_placed and distribute(placed, not_placed):
+        return np.inf
+
+    # the cells of a tree are its length plus 1
+    house_points, battery_points = (placed.house_points(),
+                                    placed.battery_points())
+    cables = sum(int(mst_weights(house_points[houses],
+                                 battery_points[battery:battery + 1])[0]) + 1
+                 for battery, houses in enumerate(placed.members))
+
+    return float(cables * CABLE_COSTS + placed.battery_costs.sum())
+
+
+def neighbour(district: District, placement: Placement,
+              occupied: Set[Tuple[int, int]]) -> Optional[Placement]:
+    """
+    This function changes a placement randomly: a battery moves, gets
+    another type or is removed, or a battery is added close to a house
+
+    Args:
+        district (District): district with the houses
+        placement (Placement): the placement of the batteries
+        occupied (Set[Tuple[int, int]]): coordinates of all houses
+
+    Returns:
+        Optional[Placement]: the new placement, None if the change is not
+            possible
+    """
+
+    width, height = district.bound()
+    batteries = list(placement)
+    battery = random.randrange(len(batteries))
+    x, y, kind = batteries[battery]
+    move = random.choice(MOVES)
+
+    # cells where no new battery can be placed
+    taken = occupied | {(x, y) for x, y, _ in placement}
+
+    if move == 'shift':
+        x = min(max(x + random.randint(-STEP, STEP), 0), width)
+        y = min(max(y + random.randint(-STEP, STEP), 0), height)
+        if (x, y) in taken:
+            return None
+        batteries[battery] = (x, y, kind)
+    elif move == 'type':
+        kind = random.choice([other for other in range(len(BATTERY_TYPES))
+                              if other != kind])
+        batteries[battery] = (x, y, kind)
+    elif move == 'remove':
+        if len(batteries) == 1:
+            return None
+        del batteries[battery]
+    else:
+        house = random.randrange(district.num_houses)
+        x = min(max(int(district.house_x[house]) +
+                    random.randint(-STEP, STEP), 0), width)
+        y = min(max(int(district.house_y[house]) +
+                    random.randint(-STEP, STEP), 0), height)
+        if (x, y) in taken:
+            return None
+        batteries.append((x, y, random.randrange(len(BATTERY_TYPES))))
+
+    return tuple(batteries)
+
+
+def search_placement(district: District, rounds: int = ROUNDS,
+                     neighbours: int = NEIGHBOURS,
+                     workers: Optional[int] = None,
+                     patience: int = PATIENCE) -> District:
+    """
+    This function improves the placement of the batteries of a district
+    with a local search. Every round a batch of random neighbours of the
+    best placement is scored in parallel, the cheapest neighbour becomes the
+    best placement when it costs less.
+
+    Args:
+        district (District): district with the start placement of
+            BATTERY_TYPES, for example from cluster_funct
+        rounds (int): maximum number of rounds
+        neighbours (int): number of placements scored every round
+        workers (Optional[int]): number of processes, all cores if None
+        patience (int): stop after this many rounds without improvement
+
+    Returns:
+        District: the district with the best placement, without connections
+    """
+
+    occupied = set(zip(district.house_x.tolist(), district.house_y.tolist()))
+    best = placement_of(district)
+    best_costs = estimate_costs(district, best)
+    unchanged = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for _ in range(rounds):
+            # random neighbours which are possible
+            candidates: List[Placement] = []
+            while len(candidates) < neighbours:
+                candidate = neighbour(district, best, occupied)
+                if candidate is not None:
+                    candidates.append(candidate)
+
+            # score the neighbours in parallel
+            costs = list(executor.map(estimate_costs,
+                                      itertools.repeat(district),
+                                      candidates))
+            cheapest = int(np.argmin(costs))
+
+            if costs[cheapest] < best_costs:
+                best, best_costs = candidates[cheapest], costs[cheapest]
+                unchanged = 0
+            else:
+                unchanged += 1
+                if unchanged >= patience:
+                    break
+
+    return place(district, best)
@@ -0,0 +1,156 @@
+"""
+This program measures where the time of a smartgrid run goes: the time,
+number of calls and optionally the peak memory of every stage, counters of
+the work that is done and optionally the functions that take the most time
+with cProfile
+"""
+
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Any, Dict, Final, Iterator, List, Optional
+import cProfile
+import pstats
+import time
+import tracemalloc
+
+# number of functions of cProfile in the report
+TOP_FUNCTIONS: Final = 20
+
+
+class Profiler:
+    """
+    Collects the timings of the stages and the counters of a run. The
+    timers are always on, cProfile and tracemalloc only when asked for.
+    """
+    def __init__(self, cprofile: bool = False, memory: bool = False) -> None:
+        """
+        Creates a profiler without measurements.
+
+        Args:
+            cprofile (bool): whether to profile all functions with cProfile.
+            memory (bool): whether to measure the peak memory of every
+                stage with tracemalloc.
+        """
+
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.peaks: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+
+        self.memory = memory
+        self.tracing = False
+        self.profile: Optional[cProfile.Profile] = (cProfile.Profile()
+                                                    if cprofile else None)
+        self.functions: List[Dict[str, Any]] = []
+
+        # highest peak of the stages inside every running stage
+        self.nested: List[int] = []
+
+    def start(self) -> None:
+        """
+        This function starts cProfile and tracemalloc if asked for
+        """
+
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.tracing = True
+        if self.profile is not None:
+            self.profile.enable()
+
+    def stop(self) -> None:
+        """
+        This function stops cProfile and tracemalloc and keeps the functions
+        that take the most time, so the profiler can be pickled
+        """
+
+        if self.profile is not None:
+            self.profile.disable()
+            self.functions = top_functions(self.profile)
+            self.profile = None
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        This function measures the time and peak memory of a stage. Stages
+        can be nested, the time of a stage includes its inner stages.
+
+        Args:
+            name (str): name of the stage
+        """
+
+        memory = self.memory and tracemalloc.is_tracing()
+        if memory:
+            tracemalloc.reset_peak()
+            self.nested.append(0)
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.seconds[name] = (self.seconds.get(name, 0.0) +
+                                  time.perf_counter() - start)
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+            # an inner stage resets the peak of the outer stage
+            if memory:
+                peak = max(tracemalloc.get_traced_memory()[1],
+                           self.nested.pop())
+                self.peaks[name] = max(self.peaks.get(name, 0), peak)
+                if self.nested:
+                    self.nested[-1] = max(self.nested[-1], peak)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        This function adds to a counter
+
+        Args:
+            name (str): name of the counter
+            amount (int): amount to add
+        """
+
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self) -> Dict[str, Any]:
+        """
+        This function gives the measurements
+
+        Returns:
+            Dict[str, Any]: the seconds, calls and peak memory in bytes of
+                every stage, the counters and the functions that take the
+                most time
+        """
+
+        stages: Dict[str, Dict[str, Any]] = {}
+        for name, seconds in self.seconds.items():
+            stages[name] = {"seconds": seconds, "calls": self.calls[name]}
+            if name in self.peaks:
+                stages[name]["peak_memory"] = self.peaks[name]
+
+        return {"stages": stages, "counters": dict(self.counters),
+                "functions": list(self.functions)}
+
+
+def top_functions(profile: cProfile.Profile,
+                  number: int = TOP_FUNCTIONS) -> List[Dict[str, Any]]:
+    """
+    This function finds the functions with the most cumulative time
+
+    Args:
+        profile (cProfile.Profile): a stopped profile
+        number (int): number of functions
+
+    Returns:
+        List[Dict[str, Any]]: the name, calls, own seconds and cumulative
+            seconds of the functions
+    """
+
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: -item[1][3])[:number]
+
+    return [{"function": f"{path}:{line}({name})", "calls": calls,
+             "seconds": own, "cumulative": cumulative}
+            for (path, line, name), (_, calls, own, cumulative, _)
+            in rows]
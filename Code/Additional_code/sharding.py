@@ -0,0 +1,74 @@
+"""
+This program runs baseline samples in parallel shards and streams the
+results to csv files, so a long baseline uses constant memory
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import deque
+from typing import Callable, Deque, Optional, Tuple, Union
+import numpy as np
+import os
+
+# a sampler gets a number of trials and a seed and returns the costs of the
+# successful trials and the number of failed trials
+Sampler = Callable[[int, Union[int, np.random.SeedSequence, None]],
+                   Tuple[np.ndarray, int]]
+
+
+def run_shards(sampler: Sampler, trials: int, output: str, stats: str,
+               chunk_size: int = 10000, workers: Optional[int] = None,
+               seed: Optional[int] = None) -> Tuple[int, int]:
+    """
+    This function splits the trials in chunks which are sampled by worker
+    processes, every chunk with its own random stream. The costs of every
+    chunk are appended to output and the number of failures of every chunk
+    to stats as soon as the chunk is done, in the order of the chunks.
+
+    Args:
+        sampler (Sampler): picklable function that samples a chunk
+        trials (int): total number of trials
+        output (str): csv file for the costs of the successful trials
+        stats (str): csv file for the trials and failures of every chunk
+        chunk_size (int): number of trials of a chunk
+        workers (Optional[int]): number of processes, all cores if None
+        seed (Optional[int]): seed of the random streams, random if None
+
+    Returns:
+        Tuple[int, int]: number of trials and number of failed trials
+    """
+
+    # an independent random stream for every chunk
+    sizes = [min(chunk_size, trials - start)
+             for start in range(0, trials, chunk_size)]
+    streams = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    total_fails = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor, \
+            open(output, 'w') as costs_file, open(stats, 'w') as stats_file:
+        costs_file.write('Costs\n')
+        stats_file.write('Chunk,Trials,Fails\n')
+
+        # keep a limited number of chunks in progress
+        window = 2 * (workers or os.cpu_count() or 1)
+        pending: Deque[Tuple[int, Future]] = deque()
+        next_chunk = 0
+
+        while next_chunk < len(sizes) or pending:
+            # submit new chunks until the window is full
+            while next_chunk < len(sizes) and len(pending) < window:
+                pending.append((next_chunk, executor.submit(
+                    sampler, sizes[next_chunk], streams[next_chunk])))
+                next_chunk += 1
+
+            # write the oldest chunk as soon as it is done
+            chunk, future = pending.popleft()
+            costs, fails = future.result()
+            total_fails += fails
+
+            np.savetxt(costs_file, costs, fmt='%d')
+            stats_file.write(f'{chunk},{sizes[chunk]},{fails}\n')
+            costs_file.flush()
+            stats_file.flush()
+
+    return trials, total_fails
@@ -1,94 +1,171 @@
 """
-This python file does simulated annealing with the geometric rule
+This python file does simulated annealing with a cooling schedule
 """
 
-from typing import List
-import pandas as pd
-import copy
-import random
+from Additional_code.annealing_state import AnnealingState
+from Additional_code.checkpoint import (check_checkpoint, load_checkpoint,
+                                        restore_random, save_checkpoint)
+from Additional_code.cooling import create_schedule
+from Additional_code.moves import MoveGenerator
+from Additional_code.trace import COLUMNS, ProgressReporter, TraceWriter
+from typing import Any, Dict, List, Optional, Sequence
 
 
-def optimization(smartgrid, iteration: int) -> None:
+def optimization(smartgrid, iteration: int, schedule: str = 'geometric',
+                 moves: Optional[Sequence[str]] = None) -> None:
     """
-    This function optimizes the lay-out of the cables
+    This function optimizes the lay-out of the cables. The composition is
+    changed in a lightweight state and a rejected switch is undone with the
+    move log, so the model is only changed once at the end. Simulated
+    annealing accepts worse switches with the Metropolis rule at the
+    temperature of the cooling schedule, the other versions only accept
+    better switches. The switches are proposed by a generator which chooses
+    the moves that pay off more often, its statistics are kept in the
+    smartgrid. Every checkpoint_every iterations of the smartgrid a
+    checkpoint is written, and with resume the optimization continues from
+    the checkpoint if there is one.
 
     Args:
         smartgrid (Smartgrid): a smartgrid
         iteration (int): number of iterations
+        schedule (str): name of the cooling schedule
+        moves (Optional[Sequence[str]]): names of the moves, all if None
     """
 
-    # initialise acceptance probability, minimum costs and best model
-    acc_prob: float = 1
-    min_costs: int = smartgrid.costs()
-    best_model = copy.deepcopy(smartgrid)
-
-    # list with the cost for each accepted iteration
-    results: List[int] = [min_costs]
-
-    # optimize for iteration number of iterations
-    for i in range(iteration):
-        # create copy of the model
-        empty_model = copy.deepcopy(smartgrid.copied_model)
-
-        # cost of current lay-out cables
-        old_costs: int = smartgrid.costs()
-
-        # select 2 different random batteries
-        battery_1, battery_2 = random.sample(smartgrid.copied_model.batteries, 2)
-
-        # select random house with lower priority
-        house_1 = random.choice(battery_1.houses)
-        house_2 = random.choice(battery_2.houses)
-
-        # skip if not enough capacity in the batteries
-        if (house_1.energy - house_2.energy > battery_2.energy or
-           house_2.energy - house_1.energy > battery_1.energy):
-            continue
-
-        # remove connection of house with battery
-        battery_1.remove_house(house_1)
-        battery_2.remove_house(house_2)
-
-        # add different house
-        battery_1.add_house(house_2)
-        battery_2.add_house(house_1)
-
-        # changed_copy
-        changed_empty_model = copy.deepcopy(smartgrid.copied_model)
-
-        # create the cables
-        smartgrid.copied_model.lay_cables_v2(smartgrid.copied_model.batteries)
-
-        # calculate the new costs
-        new_costs = smartgrid.copied_model.costs()
-
-        # acceptance probability
-        acc_prob *= 0.99
-
-        # replace best model when lower cost has been found
-        if new_costs < min_costs:
-            best_model = smartgrid.copied_model
-            min_costs = new_costs
-
-        # do simulated annealing when necessary
-        if (new_costs < old_costs and
-           smartgrid.version != 'simulated annealing'):
-            smartgrid.copy_optimize()
-        elif (smartgrid.version == 'simulated annealing' and
-              (new_costs < old_costs or random.random() <= acc_prob)):
-            smartgrid.copy_optimize()
-            results.append(new_costs)
-            smartgrid.copied_model = changed_empty_model
-            continue
-
-        # make copied model empty again
-        smartgrid.copied_model = empty_model
-
-    # make the smartgrid the best selection of the iterated models
-    smartgrid.copied_model = best_model
-    smartgrid.copy_optimize()
-
-    # export results when simulated annealing is done
-    if smartgrid.version == 'simulated annealing':
-        df = pd.DataFrame(results, columns=["Costs"])
-        df.to_csv("Smartgrid_data/simulated_annealing_data.csv")
+    generator = MoveGenerator(moves)
+
+    # settings which a checkpoint must have to continue this run
+    settings: Dict[str, Any] = {"version": smartgrid.version,
+                                "iterations": iteration,
+                                "schedule": schedule,
+                                "moves": list(generator.moves),
+                                "linking": smartgrid.linking,
+                                "placement": smartgrid.placement}
+    path: Optional[str] = smartgrid.checkpoint
+    checkpoint: Optional[Dict[str, Any]] = None
+    if smartgrid.resumes():
+        checkpoint = load_checkpoint(path)
+        check_checkpoint(checkpoint, smartgrid.core, settings)
+        smartgrid.core.assign(checkpoint["members"])
+
+    state = AnnealingState(smartgrid.core)
+
+    # initialise cooling schedule, costs and best composition
+    cooling = create_schedule(schedule, iteration)
+    old_costs: int = state.costs()
+    min_costs: int = old_costs
+    best_composition: List[List[int]] = state.snapshot()
+    start = 0
+
+    # continue where the checkpoint stopped
+    if checkpoint is not None:
+        cooling.restore(checkpoint["cooling"])
+        generator.restore(checkpoint["generator"])
+        restore_random(checkpoint)
+        min_costs = checkpoint["min_costs"]
+        best_composition = checkpoint["best"]
+        start = checkpoint["iteration"]
+
+    # stream the costs of the iterations to the trace and the progress
+    offset = None if checkpoint is None else checkpoint.get("trace")
+    writer = TraceWriter(smartgrid.trace, smartgrid.trace_every, offset=offset,
+                         acceptance=(checkpoint or {}).get("acceptance", 0.0))
+    reporter = ProgressReporter(smartgrid.progress, iteration)
+
+    with writer, reporter:
+        if start == 0:
+            writer.record(0, old_costs, min_costs, cooling.temperature, True)
+
+        # optimize for iteration number of iterations
+        for i in range(start, iteration):
+            # write a checkpoint of the iterations so far
+            if (path is not None and smartgrid.checkpoint_every and i > start
+                    and i % smartgrid.checkpoint_every == 0):
+                save_checkpoint(path, smartgrid.core, state.snapshot(),
+                                best_composition,
+                                {**settings, "iteration": i,
+                                 "min_costs": min_costs,
+                                 "cooling": cooling.checkpoint(),
+                                 "generator": generator.checkpoint(),
+                                 "trace": writer.tell(),
+                                 "acceptance": writer.acceptance})
+
+            # a change that fits in the batteries, the temperature is also
+            # lowered without one so the schedule ends at the last iteration
+            name, change = generator.propose(state)
+            if change is None:
+                cooling.step()
+                writer.record(i + 1, old_costs, min_costs,
+                              cooling.temperature, False)
+                reporter.update(i + 1, old_costs, min_costs,
+                                cooling.temperature, writer.acceptance)
+                continue
+
+            # move the houses and calculate the new costs
+            new_costs = state.apply(change)
+
+            # lower the temperature
+            best = new_costs < min_costs
+            cooling.step(best)
+
+            # remember best composition when lower cost has been found
+            if best:
+                best_composition = state.snapshot()
+                smartgrid.profiler.count("snapshots")
+                min_costs = new_costs
+
+            # do simulated annealing when necessary
+            accepted = new_costs < old_costs or (
+                smartgrid.version == 'simulated annealing' and
+                cooling.accept(new_costs - old_costs))
+            generator.evaluate(name, accepted, new_costs < old_costs, best)
+
+            if accepted:
+                state.commit()
+                old_costs = new_costs
+            else:
+                # switch the houses back
+                state.undo()
+
+            writer.record(i + 1, old_costs, min_costs, cooling.temperature,
+                          accepted)
+            reporter.update(i + 1, old_costs, min_costs, cooling.temperature,
+                            writer.acceptance)
+
+        # the last checkpoint has all iterations
+        if path is not None and smartgrid.checkpoint_every:
+            save_checkpoint(path, smartgrid.core, state.snapshot(),
+                            best_composition,
+                            {**settings, "iteration": iteration,
+                             "min_costs": min_costs,
+                             "cooling": cooling.checkpoint(),
+                             "generator": generator.checkpoint(),
+                             "trace": writer.tell(),
+                             "acceptance": writer.acceptance})
+
+    # make the smartgrid the best composition and lay the cables
+    smartgrid.core.assign(best_composition)
+    smartgrid.lay_cables_v2()
+
+    # keep the statistics of the moves
+    smartgrid.move_statistics = generator.report()
+
+
+def export_chains(traces: List[str], path: str) -> None:
+    """
+    This function joins the traces of several chains in 1 csv file with
+    the number of the chain in the first column, a line at a time
+
+    Args:
+        traces (List[str]): paths of the traces of the chains
+        path (str): path of the csv file
+    """
+
+    with open(path, 'w') as chains_file:
+        chains_file.write(",".join(["Chain"] + COLUMNS) + "\n")
+
+        for chain, trace in enumerate(traces):
+            with open(trace, 'r') as trace_file:
+                next(trace_file)
+                chains_file.writelines(f"{chain},{line}"
+                                       for line in trace_file)
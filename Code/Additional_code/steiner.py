@@ -0,0 +1,297 @@
+"""
+This program routes the cables of a battery as a rectilinear Steiner tree.
+Steiner points are added on the Hanan grid of the houses with the batched
+iterated 1-Steiner heuristic, for a number of rounds per battery with a
+time budget as upper limit.
+"""
+
+from typing import Final, List, Optional, Tuple
+import numpy as np
+import time
+
+# default number of rounds to search Steiner points for 1 battery, which
+# is enough for the districts, and the most seconds the rounds may take
+STEINER_ROUNDS: Final = 4
+STEINER_BUDGET: Final = 5.0
+
+# most points of the Hanan grid that are candidates, larger grids are
+# sampled
+MAX_CANDIDATES: Final = 512
+
+# most nodes of the trees that are scored at once, the deadline is checked
+# between chunks
+CHUNK_NODES: Final = 1 << 14
+
+
+def mst_weights(points: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """
+    This function calculates the weight of the rectilinear minimum spanning
+    tree of the points together with each candidate, for all candidates at
+    once with Prim's algorithm
+
+    Args:
+        points (np.ndarray): (N, 2) points of the tree
+        candidates (np.ndarray): (M, 2) candidate points
+
+    Returns:
+        np.ndarray: (M,) weight of the tree with every candidate
+    """
+
+    # the nodes of every tree: the points and 1 candidate
+    nodes = np.concatenate((np.broadcast_to(points, (len(candidates),) +
+                                            points.shape),
+                            candidates[:, None, :]), axis=1)
+    rows = np.arange(len(candidates))
+
+    # start every tree at the first point
+    in_tree = np.zeros(nodes.shape[:2], dtype=bool)
+    in_tree[:, 0] = True
+    keys = np.abs(nodes - nodes[:, :1]).sum(axis=2)
+    weights = np.zeros(len(candidates), dtype=np.int64)
+
+    for _ in range(nodes.shape[1] - 1):
+        # add the closest node that is not in the tree yet
+        closest = np.argmin(np.where(in_tree, np.iinfo(np.int64).max, keys),
+                            axis=1)
+        weights += keys[rows, closest]
+        in_tree[rows, closest] = True
+
+        # update the distances of the other nodes to the tree
+        keys = np.minimum(keys, np.abs(nodes - nodes[rows, closest][:, None])
+                          .sum(axis=2))
+
+    return weights
+
+
+def mst_edges(points: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    This function finds the edges of the rectilinear minimum spanning tree
+    of the points with Prim's algorithm
+
+    Args:
+        points (np.ndarray): (N, 2) points
+
+    Returns:
+        List[Tuple[int, int]]: pairs of point indices
+    """
+
+    in_tree = np.zeros(len(points), dtype=bool)
+    in_tree[0] = True
+    keys = np.abs(points - points[0]).sum(axis=1)
+    parents = np.zeros(len(points), dtype=np.int64)
+    edges: List[Tuple[int, int]] = []
+
+    for _ in range(len(points) - 1):
+        closest = int(np.argmin(np.where(in_tree, np.iinfo(np.int64).max,
+                                         keys)))
+        edges.append((int(parents[closest]), closest))
+        in_tree[closest] = True
+
+        # remember which tree node is closest to every other node
+        distances = np.abs(points - points[closest]).sum(axis=1)
+        closer = distances < keys
+        keys[closer] = distances[closer]
+        parents[closer] = closest
+
+    return edges
+
+
+def remove_steiner_points(points: np.ndarray, terminals: int,
+                          deadline: float = np.inf) -> np.ndarray:
+    """
+    This function removes the Steiner points with at most 2 edges in the
+    minimum spanning tree, which do not make the tree shorter
+
+    Args:
+        points (np.ndarray): (N, 2) terminals followed by Steiner points
+        terminals (int): number of terminals
+        deadline (float): time of perf_counter after which the remaining
+            points are kept
+
+    Returns:
+        np.ndarray: the terminals and the useful Steiner points
+    """
+
+    while len(points) > terminals and time.perf_counter() < deadline:
+        degrees = np.zeros(len(points), dtype=np.int64)
+        for start, end in mst_edges(points):
+            degrees[start] += 1
+            degrees[end] += 1
+
+        useless = np.flatnonzero(degrees[terminals:] <= 2) + terminals
+        if len(useless) == 0:
+            break
+        points = np.delete(points, useless[:1], axis=0)
+
+    return points
+
+
+def hanan_grid(terminals: np.ndarray,
+               size: int = MAX_CANDIDATES) -> np.ndarray:
+    """
+    This function gives the points of the Hanan grid of the terminals
+    without the terminals. A larger grid is sampled with a fixed seed, so
+    the grid is never built in full and the sample is always the same.
+
+    Args:
+        terminals (np.ndarray): (N, 2) different points to connect
+        size (int): most points of the grid
+
+    Returns:
+        np.ndarray: (M, 2) points of the grid, row by row
+    """
+
+    xs, ys = np.unique(terminals[:, 0]), np.unique(terminals[:, 1])
+    cells = len(xs) * len(ys)
+
+    # the points are numbered row by row
+    if cells <= size:
+        codes = np.arange(cells)
+    else:
+        codes = np.sort(np.random.default_rng(0).choice(cells, size,
+                                                        replace=False))
+    taken = (np.searchsorted(ys, terminals[:, 1]) * len(xs) +
+             np.searchsorted(xs, terminals[:, 0]))
+    codes = codes[~np.isin(codes, taken)]
+
+    return np.column_stack((xs[codes % len(xs)], ys[codes // len(xs)]))
+
+
+def steiner_points(terminals: np.ndarray, budget: float = STEINER_BUDGET,
+                   rounds: Optional[int] = STEINER_ROUNDS
+                   ) -> Optional[np.ndarray]:
+    """
+    This function adds Steiner points to the terminals with the batched
+    iterated 1-Steiner heuristic: every round the gain of every point of the
+    Hanan grid is calculated, and the points are added in order of gain as
+    long as they still make the tree shorter. The gains are calculated in
+    chunks and the search stops at the first check after the deadline.
+
+    Args:
+        terminals (np.ndarray): (N, 2) different points to connect
+        budget (float): most seconds to search Steiner points, the points
+            only depend on the speed of the machine when the rounds take
+            longer
+        rounds (Optional[int]): number of rounds, no limit if None
+
+    Returns:
+        Optional[np.ndarray]: the terminals followed by the Steiner points,
+            None if the budget ran out before a round was scored
+    """
+
+    deadline = time.perf_counter() + budget
+    points = terminals
+    hanan = hanan_grid(terminals)
+    weight = mst_weights(points[1:], points[:1])[0]
+    round_number = 0
+
+    while len(hanan) > 0 and (rounds is None or round_number < rounds):
+        # the gains of the candidates, a chunk of trees at once
+        chunk = max(1, CHUNK_NODES // (len(points) + 1))
+        gains = np.empty(len(hanan), dtype=np.int64)
+        for start in range(0, len(hanan), chunk):
+            if time.perf_counter() >= deadline:
+                return points if round_number else None
+            gains[start:start + chunk] = weight - mst_weights(
+                points, hanan[start:start + chunk])
+        round_number += 1
+
+        # candidates in order of decreasing gain
+        order = np.argsort(-gains, kind='stable')
+        order = order[gains[order] > 0]
+        if len(order) == 0:
+            break
+
+        # add the candidates that still make the tree shorter
+        added = np.zeros(len(hanan), dtype=bool)
+        for candidate in order:
+            if time.perf_counter() >= deadline:
+                break
+
+            new_weight = mst_weights(points, hanan[candidate:candidate + 1])
+            if new_weight[0] < weight:
+                points = np.concatenate((points, hanan[candidate:candidate +
+                                                       1]))
+                weight = new_weight[0]
+                added[candidate] = True
+
+        if not added.any():
+            break
+
+        hanan = hanan[~added]
+        points = remove_steiner_points(points, len(terminals), deadline)
+        weight = mst_weights(points[1:], points[:1])[0]
+
+    return points
+
+
+def l_path(start: Tuple[int, int], end: Tuple[int, int],
+           vertical_first: bool) -> List[Tuple[int, int]]:
+    """
+    This function creates an L-shaped path of cells between 2 points
+
+    Args:
+        start (Tuple[int, int]): first point
+        end (Tuple[int, int]): last point
+        vertical_first (bool): whether the path starts vertically
+
+    Returns:
+        List[Tuple[int, int]]: the cells of the path, with both points
+    """
+
+    (x_1, y_1), (x_2, y_2) = start, end
+    corner = (x_1, y_2) if vertical_first else (x_2, y_1)
+
+    path: List[Tuple[int, int]] = []
+    for (a_x, a_y), (b_x, b_y) in [(start, corner), (corner, end)]:
+        step_x = 1 if b_x >= a_x else -1
+        step_y = 1 if b_y >= a_y else -1
+        path += [(x, y) for x in range(a_x, b_x + step_x, step_x)
+                 for y in range(a_y, b_y + step_y, step_y)]
+
+    return path
+
+
+def steiner_path(points: List[Tuple[int, int]],
+                 budget: float = STEINER_BUDGET,
+                 rounds: Optional[int] = STEINER_ROUNDS
+                 ) -> Optional[List[Tuple[int, int]]]:
+    """
+    This function routes a rectilinear Steiner tree through the points. The
+    edges of the tree are laid as L-shaped paths which overlap as much as
+    possible with the cables that have been laid already.
+
+    Args:
+        points (List[Tuple[int, int]]): the battery and its houses
+        budget (float): most seconds to search Steiner points
+        rounds (Optional[int]): number of rounds, no limit if None
+
+    Returns:
+        Optional[List[Tuple[int, int]]]: the cells of the tree without
+            duplicates, None if the budget ran out before a round was scored
+    """
+
+    # the first point and the other points sorted, so the tree does not
+    # depend on the order in which the houses were connected
+    unique = list(dict.fromkeys(points))
+    terminals = np.array(unique[:1] + sorted(unique[1:]), dtype=np.int64)
+    if len(terminals) == 1:
+        return [tuple(terminals[0].tolist())]
+
+    nodes = steiner_points(terminals, budget, rounds)
+    if nodes is None:
+        return None
+    cells = {tuple(point): None for point in terminals.tolist()}
+
+    for start, end in mst_edges(nodes):
+        start_point = tuple(nodes[start].tolist())
+        end_point = tuple(nodes[end].tolist())
+
+        # the orientation that needs the fewest new cables
+        paths = [l_path(start_point, end_point, vertical_first)
+                 for vertical_first in (True, False)]
+        path = min(paths, key=lambda path: sum(cell not in cells
+                                               for cell in path))
+        cells.update(dict.fromkeys(path))
+
+    return list(cells)
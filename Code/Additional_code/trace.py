@@ -0,0 +1,235 @@
+"""
+This program streams the trace of the optimization to a csv file in
+buffered chunks, and reports the progress of a run in lines that can be
+followed with tail, so a long run needs no list of all its costs
+"""
+
+from __future__ import annotations
+from typing import Any, Final, List, Optional, TextIO, Tuple
+import os
+import sys
+import time
+
+# default number of rows that are written at once
+BUFFER: Final = 1000
+
+# number of iterations of which the acceptance rate is the mean
+WINDOW: Final = 100
+
+# default seconds between progress lines
+INTERVAL: Final = 1.0
+
+# default path of the costs of simulated annealing
+TRACE: Final = "Smartgrid_data/simulated_annealing_data.csv"
+
+# columns of the trace
+COLUMNS: Final = ["Iteration", "Costs", "Best", "Temperature", "Acceptance"]
+
+
+def chains_path(trace: str) -> str:
+    """
+    This function gives the path of the joined traces of the chains of a
+    run next to its trace, so runs with different traces keep their chains
+
+    Args:
+        trace (str): path of the trace of the run
+
+    Returns:
+        str: the path of the trace with '_chains' after its name
+    """
+
+    root, extension = os.path.splitext(trace)
+    return f"{root}_chains{extension}"
+
+
+class TraceWriter:
+    """
+    Writes a row for every few iterations to a csv file. The rows are
+    buffered and written in chunks, without a path nothing is written.
+    """
+    def __init__(self, path: Optional[str], every: int = 1,
+                 buffer: int = BUFFER, offset: Optional[int] = None,
+                 acceptance: float = 0.0) -> None:
+        """
+        Creates the csv file with the header, or continues a trace.
+
+        Args:
+            path (Optional[str]): path of the csv file, None to write nothing.
+            every (int): iterations between rows.
+            buffer (int): number of rows that are written at once.
+            offset (Optional[int]): size of the file when the trace is
+                continued, the rows after it are removed. A new file if None.
+            acceptance (float): acceptance rate when the trace is continued.
+        """
+
+        self.path = path
+        self.every = max(every, 1)
+        self.buffer = buffer
+        self.rows: List[Tuple[int, int, int, float, float]] = []
+
+        # the acceptance rate over the last iterations
+        self.acceptance = acceptance
+        self.iterations = WINDOW if offset is not None else 0
+
+        self.file: Optional[TextIO] = None
+        if path is None:
+            return
+
+        if offset is None:
+            self.file = open(path, 'w')
+            self.file.write(",".join(COLUMNS) + "\n")
+        else:
+            self.file = open(path, 'r+')
+            self.file.seek(offset)
+            self.file.truncate()
+
+    def __enter__(self) -> TraceWriter:
+        return self
+
+    def __exit__(self, *exception: Any) -> None:
+        self.close()
+
+    def record(self, iteration: int, costs: int, best: int,
+               temperature: float, accepted: bool) -> None:
+        """
+        This function adds an iteration to the acceptance rate and to the
+        trace if it is one of every few iterations
+
+        Args:
+            iteration (int): number of the iteration
+            costs (int): costs of the current composition
+            best (int): lowest costs so far
+            temperature (float): temperature of the cooling schedule
+            accepted (bool): whether the change of the iteration is accepted
+        """
+
+        self.iterations += 1
+        self.acceptance += ((accepted - self.acceptance) /
+                            min(self.iterations, WINDOW))
+
+        if self.file is None or iteration % self.every:
+            return
+
+        self.rows.append((iteration, costs, best, temperature,
+                          self.acceptance))
+        if len(self.rows) >= self.buffer:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        This function writes the buffered rows
+        """
+
+        if self.file is None:
+            return
+
+        self.file.writelines(f"{iteration},{costs},{best},{temperature:.6g},"
+                             f"{acceptance:.4f}\n"
+                             for iteration, costs, best, temperature,
+                             acceptance in self.rows)
+        self.file.flush()
+        self.rows.clear()
+
+    def tell(self) -> Optional[int]:
+        """
+        This function writes the buffered rows and gives the size of the
+        file, from which a continued trace starts
+
+        Returns:
+            Optional[int]: size of the file, None without a path
+        """
+
+        if self.file is None:
+            return None
+
+        self.flush()
+        return self.file.tell()
+
+    def close(self) -> None:
+        """
+        This function writes the buffered rows and closes the file
+        """
+
+        if self.file is not None:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+
+class ProgressReporter:
+    """
+    Writes a line with the iterations per second and the costs at most once
+    per interval, to a file or to the error output for '-'. Without a path
+    nothing is written.
+    """
+    def __init__(self, path: Optional[str], iterations: int,
+                 interval: float = INTERVAL) -> None:
+        """
+        Creates the reporter.
+
+        Args:
+            path (Optional[str]): path of the progress file, '-' for the
+                error output, None to write nothing.
+            iterations (int): total number of iterations.
+            interval (float): seconds between lines.
+        """
+
+        self.iterations = iterations
+        self.interval = interval
+        self.stream: Optional[TextIO] = None
+        if path == '-':
+            self.stream = sys.stderr
+        elif path is not None:
+            self.stream = open(path, 'a', buffering=1)
+
+        self.last_time = time.perf_counter()
+        self.last_iteration: Optional[int] = None
+
+    def __enter__(self) -> ProgressReporter:
+        return self
+
+    def __exit__(self, *exception: Any) -> None:
+        self.close()
+
+    def update(self, iteration: int, costs: int, best: int,
+               temperature: float, acceptance: float) -> None:
+        """
+        This function writes a progress line when the interval has passed
+
+        Args:
+            iteration (int): number of the iteration
+            costs (int): costs of the current composition
+            best (int): lowest costs so far
+            temperature (float): temperature of the cooling schedule
+            acceptance (float): acceptance rate of the last iterations
+        """
+
+        if self.stream is None:
+            return
+
+        # start counting at the first iteration of this run
+        if self.last_iteration is None:
+            self.last_iteration = iteration
+
+        now = time.perf_counter()
+        if now - self.last_time < self.interval and \
+                iteration < self.iterations:
+            return
+
+        speed = (iteration - self.last_iteration) / max(now - self.last_time,
+                                                        1e-9)
+        self.stream.write(f"{iteration}/{self.iterations} iterations, "
+                          f"{speed:.0f} it/s, costs {costs}, best {best}, "
+                          f"temperature {temperature:.3g}, acceptance "
+                          f"{acceptance:.2f}\n")
+        self.stream.flush()
+        self.last_time, self.last_iteration = now, iteration
+
+    def close(self) -> None:
+        """
+        This function closes the progress file
+        """
+
+        if self.stream is not None and self.stream is not sys.stderr:
+            self.stream.close()
+        self.stream = None
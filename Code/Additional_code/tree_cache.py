@@ -0,0 +1,101 @@
+"""
+This program caches the merged cable trees of batteries by the houses that
+are connected, so a composition that comes back does not have to be merged
+again
+"""
+
+from __future__ import annotations
+from Additional_code.lay_cables import merged_path
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Final, List, Tuple
+
+# default number of trees in the cache
+TREE_CACHE_SIZE: Final = 4096
+
+# a tree is known by the position of its battery and the set of its houses
+Key = Tuple[Tuple[int, int], FrozenSet[int]]
+
+
+class TreeCache:
+    """
+    Least recently used cache from the battery position and the set of
+    connected houses to the merged cable tree. The first tree that is merged
+    for a set of houses is kept, so the same set always gets the same number
+    of cables, whatever order the houses were connected in.
+    """
+    def __init__(self, size: int = TREE_CACHE_SIZE) -> None:
+        """
+        Creates an empty cache.
+
+        Args:
+            size (int): maximum number of trees, 0 to disable the cache.
+        """
+
+        self.size = size
+        self.trees: OrderedDict[Key, Tuple[Tuple[int, int], ...]] = \
+            OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.trees)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the trees are not sent to other processes, only the counters
+        state = self.__dict__.copy()
+        state['trees'] = OrderedDict()
+        return state
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        The fraction of the requests that was found in the cache
+        """
+
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+    def merged_path(self, battery_point: Tuple[int, int], houses: List[int],
+                    house_points: List[Tuple[int, int]]
+                    ) -> Tuple[Tuple[int, int], ...]:
+        """
+        This function gives the merged tree of a battery and its houses,
+        from the cache if the same houses have been merged before
+
+        Args:
+            battery_point (Tuple[int, int]): coordinates of the battery
+            houses (List[int]): indices of the houses in order of connection
+            house_points (List[Tuple[int, int]]): coordinates of all houses
+
+        Returns:
+            Tuple[Tuple[int, int], ...]: all unique points of the tree
+        """
+
+        key = (battery_point, frozenset(houses))
+        tree = self.trees.get(key)
+
+        if tree is not None:
+            self.hits += 1
+            self.trees.move_to_end(key)
+            return tree
+
+        self.misses += 1
+        tree = tuple(merged_path([[battery_point]] +
+                                 [[house_points[house]] for house in houses]))
+
+        # remember the tree and forget the least recently used tree
+        if self.size > 0:
+            self.trees[key] = tree
+            if len(self.trees) > self.size:
+                self.trees.popitem(last=False)
+
+        return tree
+
+    def clear(self) -> None:
+        """
+        This function removes all trees and resets the counters
+        """
+
+        self.trees.clear()
+        self.hits = 0
+        self.misses = 0
@@ -73,16 +73,23 @@ def agent_portrayal(agent):
     return portrayal
 
 
-def plot_annealing() -> None:
+def plot_annealing(path: str =
+                   "Smartgrid_data/simulated_annealing_data.csv") -> None:
     """
     This function plots the simulated annealing data
+
+    Args:
+        path (str): path of the simulated annealing data
     """
 
     # import the data
-    data = pd.read_csv("Smartgrid_data/simulated_annealing_data.csv")
+    data = pd.read_csv(path, usecols=["Iteration", "Costs", "Best"])
 
-    # plot the graph of the costs
-    plt.plot(list(range(len(data))), data.Costs)
+    # plot the graph of the current and the best costs
+    plt.plot(data.Iteration, data.Costs, label="Costs")
+    plt.plot(data.Iteration, data.Best, label="Best")
+    plt.xlabel("Iteration")
+    plt.legend()
     plt.show()
 
     # print the costs
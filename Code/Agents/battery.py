@@ -3,10 +3,9 @@ This program creates a battery class
 """
 
 from __future__ import annotations
-from typing import List, Tuple
-from Agents.cable import Cable
-import pandas as pd
-import copy
+from typing import Optional
+from Agents.cable import Cable, CableTree
+from Additional_code.cell_set import CellSet
 import mesa
 
 
@@ -35,42 +34,42 @@ class Battery(mesa.Agent):
         self.energy = energy  # remaining energy space
         self.houses = []  # all houses connected to this battery
         self.all_paths = [[(x, y)]]
-        self.copy_paths: List[List[Tuple[int, int]]] = []
+        self.tree: Optional[CableTree] = None
         self.costs = costs
 
-    def copy_all_paths(self) -> None:
-        """
-        This function deepcopy's all paths of battery
-        """
-
-        self.copy_paths = copy.deepcopy(self.all_paths)
-
     def lay_cables(self) -> int:
         """
-        This function will draw all the cables from the houses to the Battery
+        This function will draw all the cables from the houses to the Battery.
+        The houses share 1 cable tree instead of a copy of every cable.
+
+        Returns:
+            int: number of cables of the battery
         """
 
         # remove duplicates
-        path = pd.unique(self.all_paths[0])
+        path = CellSet(self.all_paths[0])
 
-        # create and place the cables
-        for i, point in enumerate(path):
-            # create new cable
-            cable = Cable(i + 150*self.unique_id,
-                          self.model, point[0], point[1], self.unique_id)
+        # create the cables once for all houses of the battery
+        self.tree = CableTree(self.unique_id, (
+            Cable(i + 150*self.unique_id, point[0], point[1], self.unique_id)
+            for i, point in enumerate(path)))
 
-            # add cable to all houses connected to the battery
-            for house in self.houses:
-                house.add_cable(cable)
+        # all houses connected to the battery refer to the same tree
+        for house in self.houses:
+            house.share_cables(self.tree)
+
+        # place the cables
+        for cable in self.tree:
+            cable.battery_connection = self
 
             # place cable in grid
-            self.model.grid.place_agent(cable, point)
+            self.model.grid.place_agent(cable, (cable.x, cable.y))
 
             # add cable to the model's cable list
             self.model.cables.append(cable)
 
         # add all cables to number of cables
-        return i
+        return len(self.tree)
 
     def add_house(self, house) -> None:
         """
@@ -91,33 +90,3 @@ class Battery(mesa.Agent):
 
         # append the coordinate of the house to the paths property
         self.all_paths.append([(house.x, house.y)])
-
-    def remove_house(self, house) -> None:
-        """
-        This function removes a house from the battery
-
-        Args:
-            house (House): a connected house
-        """
-
-        # remove house from the houses list
-        self.houses.remove(house)
-
-        # add the house's energy to the battery's energy
-        self.energy += house.energy
-
-        # remove the house coordinates from the paths
-        self.all_paths.remove([(house.x, house.y)])
-
-        # remove connection
-        house.connection = None
-
-    def get_len_paths(self) -> int:
-        """
-        This function gives the length of the remaining paths
-
-        Returns:
-            int: number of paths remaining
-        """
-
-        return len(self.all_paths)
@@ -1,31 +1,69 @@
 """
-This program creates a cable class
+This program creates a cable class and the cable tree of a battery
 """
 
 from __future__ import annotations
-import mesa
+from typing import Any, Iterable, Iterator, Optional, Tuple
 
 
-class Cable(mesa.Agent):
+class Cable:
     """
-    Cable agent that connects houses to batteries.
+    Cable that connects houses to batteries. A cable is a small value with
+    slots instead of an agent, but it can be placed on a mesa grid.
     """
-    def __init__(self, unique_id: int, model: mesa.Model,
-                 x: int, y: int, battery_id: int) -> None:
+    __slots__ = ('unique_id', 'x', 'y', 'battery_id', 'battery_connection',
+                 'pos')
+
+    def __init__(self, unique_id: int, x: int, y: int,
+                 battery_id: int) -> None:
         """
-        Creates a cable agent with a unique id that has a x and y coordinate.
+        Creates a cable with a unique id that has a x and y coordinate.
         Also tracks to which battery it connects.
 
         Args:
             unique_id (int): unique id of the cable.
-            model (mesa.Model): model the agent belongs to.
-            x (int): x coordinate of the agent.
-            y (int): y coordinate of the agent.
+            x (int): x coordinate of the cable.
+            y (int): y coordinate of the cable.
             battery_id (int): id of the battery to which the cable connects.
         """
 
-        super().__init__(unique_id, model)
+        self.unique_id = unique_id
         self.x = x
         self.y = y
-        self.battery_connection = None
+        self.battery_connection: Any = None
         self.battery_id = battery_id
+
+        # position on the grid, set when the cable is placed
+        self.pos: Optional[Tuple[int, int]] = None
+
+
+class CableTree:
+    """
+    The cables of a battery which all its houses share. The tree can not
+    be changed, so every house can refer to the same tree.
+    """
+    __slots__ = ('battery_id', 'cables')
+
+    def __init__(self, battery_id: int, cables: Iterable[Cable]) -> None:
+        """
+        Creates the cable tree of a battery.
+
+        Args:
+            battery_id (int): id of the battery of the cables.
+            cables (Iterable[Cable]): the cables in order of laying.
+        """
+
+        object.__setattr__(self, 'battery_id', battery_id)
+        object.__setattr__(self, 'cables', tuple(cables))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("a cable tree can not be changed")
+
+    def __iter__(self) -> Iterator[Cable]:
+        return iter(self.cables)
+
+    def __len__(self) -> int:
+        return len(self.cables)
+
+    def __getitem__(self, index: int) -> Cable:
+        return self.cables[index]
@@ -4,6 +4,8 @@ This program creates a house class
 
 from __future__ import annotations
 from Agents.battery import Battery
+from Agents.cable import Cable, CableTree
+from typing import List, Union
 import mesa
 
 
@@ -30,9 +32,10 @@ class House(mesa.Agent):
         self.y = y
         self.energy = energy
 
-        # initialize connection, cable list and priority level
+        # initialize connection, cables and priority level, the cables are
+        # its own cables or the cable tree it shares with its battery
         self.connection: Battery = None
-        self.cables = []
+        self.cables: Union[List[Cable], CableTree] = []
         self.priority: float = 0
 
     def add_cable(self, cable) -> None:
@@ -42,6 +45,16 @@ class House(mesa.Agent):
 
         self.cables.append(cable)
 
+    def share_cables(self, tree: CableTree) -> None:
+        """
+        Connects the house to the cable tree of its battery
+
+        Args:
+            tree (CableTree): the cables of the battery
+        """
+
+        self.cables = tree
+
     def distance(self, other: Battery) -> float:
         """
         Function that returns the Manhattan distance between the house
@@ -6,22 +6,39 @@ from __future__ import annotations
 from Agents.cable import Cable
 from Agents.house import House
 from Agents.battery import Battery
-from typing import Union, Optional, Tuple, List
+from Additional_code.cell_set import CellSet
+from Additional_code.district import (BATTERY_COSTS, DistrictKey,
+                                      district_name, parse_district,
+                                      read_district)
+from Additional_code.monte_carlo import sample_chunk
+from Additional_code.sharding import run_shards
+from typing import Final, Union, Optional, Tuple, List
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
+import itertools
+import argparse
 import mesa
 import random
-import csv
+import sys
+from functools import partial
+
+# default paths of the costs and the failures per chunk
+OUTPUT: Final = "Baseline_data/baseline{district}_{version}.csv"
+STATS: Final = "Baseline_data/baseline{district}_{version}_stats.csv"
+
+# default number of random grids per chunk for version 1 and version 2
+CHUNK_SIZES: Final = {1: 10000, 2: 100}
 
 
 class SmartGrid(mesa.Model):
     """A smartgrid situation"""
-    def __init__(self, district: int, version: int) -> None:
+    def __init__(self, district: DistrictKey, version: int) -> None:
         # objects
         self.houses: List[House] = self.add_objects(district, 'houses')
         self.batteries: List[House] = self.add_objects(district, 'batteries')
         self.objects = self.houses + self.batteries
+        self.version = version
 
         self.num_cables: int = 0  # initialize at 0
         self.success: bool = True  # tracks the random composition
@@ -59,59 +76,31 @@ class SmartGrid(mesa.Model):
 
         return (x, y)
 
-    def add_objects(self, district: int,
+    def add_objects(self, district: DistrictKey,
                     info: str) -> Union[List[House], List[Battery]]:
         """
         Add houses or battery list of district depending on 'info'
 
         Args:
-            district (int): district number
+            district (DistrictKey): district number or path
             info (str): 'houses' or 'batteries'
 
         Returns:
             a list with all the houses or batteries
         """
 
-        # path to data
-        path = 'Huizen&Batterijen/district_' + str(district)
-        path += '/district-' + str(district) + '_' + info + '.csv'
-
-        # list with the information
-        lst = []
-
-        # add the information to the list
-        with open(path, 'r') as csv_file:
-            data = csv.reader(csv_file)
-
-            # index to skip header
-            count = 0
-
-            # go through all rows except the first
-            for line in data:
-                # skip header
-                if count == 0:
-                    count += 1
-                    continue
+        house_points, outputs, battery_points, capacities = read_district(
+            district)
 
-                # convert the data to a neat list with floats
-                if not line[0].isnumeric():
-                    neat_data = line[0].split(',')
-                    line = neat_data + [line[1]]
+        # append a house or Battery for every row, the ids start at 1
+        if info == 'houses':
+            return [House(count, self, x, y, energy) for count, ((x, y),
+                    energy) in enumerate(zip(house_points.tolist(),
+                                             outputs.tolist()), 1)]
 
-                # information
-                x = int(line[0])
-                y = int(line[1])
-                energy = float(line[2])
-
-                # append a house or Battery
-                if info == 'houses':
-                    lst.append(House(count, self, x, y, energy))
-                else:
-                    lst.append(Battery(count, self, x, y, energy, 5000))
-
-                count += 1
-
-        return lst
+        return [Battery(count, self, x, y, energy, BATTERY_COSTS)
+                for count, ((x, y), energy) in enumerate(zip(
+                    battery_points.tolist(), capacities.tolist()), 1)]
 
     def lay_cable_random(self) -> None:
         """
@@ -171,9 +160,9 @@ class SmartGrid(mesa.Model):
             path = horizontal + vertical
 
             # remove the duplicate coordinates at turns
-            path = pd.unique(path).tolist()
+            path = CellSet(path).to_list()
 
-            if version == 1:
+            if self.version == 1:
                 for space in path:
                     # add cable to the house and place it
                     self.add_cable(space[0], space[1], house, cable_id)
@@ -217,7 +206,7 @@ class SmartGrid(mesa.Model):
         """
 
         # creates the cable
-        new_cable = Cable(cable_id, self, x, y, house.connection.unique_id)
+        new_cable = Cable(cable_id, x, y, house.connection.unique_id)
         new_cable.battery_connection = house.connection
         house.add_cable(new_cable)
 
@@ -249,52 +238,197 @@ class SmartGrid(mesa.Model):
         return self.costs_grid
 
 
-if __name__ == "__main__":
-    # information to keep track of
-    results: List[int] = []
-    fails: int = 0
+def ask_arguments() -> argparse.Namespace:
+    """
+    This function asks the user for the settings of a single baseline
+
+    Returns:
+        argparse.Namespace: the settings in the same format as the cli
+    """
 
     # asks user for valid input district
     district = input('Which district would you like to run (1-3): ')
     while district not in ["1", "2", "3"]:
         district = input('Which district would you like to run (1-3): ')
 
-    # convert district to an integer
-    district = int(district)
-
     # asks user for valid input version
     version = input('Which version would you like to run (1/2): ')
     while version not in ["1", "2"]:
         version = input('Which version would you like to run (1/2): ')
 
-    # convert version to integer
-    version = int(version)
-
     # run the random model x times and save the results
     iterations = int(input("How many iterations would you like to run: "))
     while iterations < 0:
         # run the random model x times and save the results
         iterations = int(input("How many iterations would you like to run: "))
 
-    # run the simulation iterations times
-    for i in range(iterations):
-        test_wijk_1 = SmartGrid(1, version)
+    return argparse.Namespace(district=[int(district)],
+                              version=[int(version)], iterations=[iterations],
+                              seed=[None], output=OUTPUT, stats=STATS,
+                              workers=None, chunk_size=None,
+                              no_visualisation=False)
+
+
+def parse_arguments(argv: List[str]) -> argparse.Namespace:
+    """
+    This function parses the command line arguments. Every setting can get
+    several values, all combinations of them are run in this process.
+
+    Args:
+        argv (List[str]): the command line arguments
+
+    Returns:
+        argparse.Namespace: the settings
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Run random baselines. Giving several values for a "
+                    "setting runs all combinations in one process.")
+    parser.add_argument("-d", "--district", type=parse_district, nargs="+",
+                        required=True,
+                        help="district number(s) or folder(s) with a houses "
+                             "and a batteries csv file")
+    parser.add_argument("-v", "--version", type=int, nargs="+", default=[1],
+                        choices=[1, 2], help="version(s) to run")
+    parser.add_argument("-i", "--iterations", type=int, nargs="+",
+                        default=[1000], help="number of random grids")
+    parser.add_argument("-s", "--seed", type=int, nargs="+", default=[None],
+                        help="seed(s) of the random generator")
+    parser.add_argument("-o", "--output", default=OUTPUT,
+                        help="path of the costs, can use {district}, "
+                             "{version}, {iterations} and {seed}")
+    parser.add_argument("--stats", default=STATS,
+                        help="path of the failures per chunk, with the same "
+                             "fields as --output")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of processes, all cores by default")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="number of random grids per chunk, 10000 for "
+                             "version 1 and 100 for version 2 by default")
+    parser.add_argument("--no-visualisation", action="store_true",
+                        help="do not show the histogram")
+
+    return parser.parse_args(argv)
+
+
+def sample_grids(district: DistrictKey, version: int, trials: int,
+                 seed: Union[int, np.random.SeedSequence, None] = None
+                 ) -> Tuple[np.ndarray, int]:
+    """
+    This function creates random grids with the model and keeps track of
+    the costs and failures
+
+    Args:
+        district (DistrictKey): district number or path
+        version (int): version of the cables
+        trials (int): number of random grids
+        seed (Union[int, np.random.SeedSequence, None]): seed of the random
+            generator, random if None
+
+    Returns:
+        Tuple[np.ndarray, int]: costs of the successful grids and the number
+            of failed grids
+    """
+
+    # information to keep track of
+    results: List[int] = []
+    fails: int = 0
+
+    if isinstance(seed, np.random.SeedSequence):
+        seed = int(seed.generate_state(1)[0])
+    random.seed(seed)
+
+    # run the simulation trials times
+    for i in range(trials):
+        smartgrid = SmartGrid(district, version)
 
         # keep track of costs and number of fails
-        if test_wijk_1.costs() is not None:
-            results.append(test_wijk_1.costs())
+        if smartgrid.costs() is not None:
+            results.append(smartgrid.costs())
         else:
             fails += 1
 
-    # calculate percantage failed simulations and print that
-    perc_fails = (fails / iterations) * 100
-    print(f"The percentage failed is {round(perc_fails, 1)}%")
+    return np.array(results, dtype=np.int64), fails
+
+
+def run(district: DistrictKey, version: int, iterations: int,
+        seed: Optional[int], output: str, stats: str,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None) -> float:
+    """
+    This function runs the random model a number of times in parallel
+    chunks. The costs are streamed to output and the failures of every
+    chunk to stats.
+
+    Args:
+        district (DistrictKey): district number or path
+        version (int): version of the cables
+        iterations (int): number of random grids
+        seed (Optional[int]): seed of the random generator, random if None
+        output (str): path of the csv with the costs
+        stats (str): path of the csv with the failures per chunk
+        workers (Optional[int]): number of processes, all cores if None
+        chunk_size (Optional[int]): number of random grids per chunk, the
+            default of the version if None
+
+    Returns:
+        float: the percentage of failed grids
+    """
+
+    if version == 1:
+        # version 1 only needs distances, so sample without agents
+        sampler = partial(sample_chunk, district)
+    else:
+        sampler = partial(sample_grids, district, version)
+
+    trials, fails = run_shards(sampler, iterations, output, stats,
+                               chunk_size or CHUNK_SIZES[version], workers,
+                               seed)
+
+    # calculate percantage failed simulations
+    return (fails / max(trials, 1)) * 100
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    This function runs baselines with the command line arguments, or asks
+    for the settings when there are none
+
+    Args:
+        argv (Optional[List[str]]): the command line arguments
+    """
+
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv:
+        arguments = parse_arguments(argv)
+    else:
+        arguments = ask_arguments()
+
+    # all combinations of the settings
+    runs = list(itertools.product(arguments.district, arguments.version,
+                                  arguments.iterations, arguments.seed))
+
+    for district, version, iterations, seed in runs:
+        fields = {"district": district_name(district), "version": version,
+                  "iterations": iterations, "seed": seed}
+        output = arguments.output.format(**fields)
+        perc_fails = run(district, version, iterations, seed, output,
+                         arguments.stats.format(**fields), arguments.workers,
+                         arguments.chunk_size)
+
+        # print the percentage of failed simulations
+        if len(runs) > 1:
+            print(", ".join(f"{key}={value}" for key, value
+                            in fields.items()), end=": ")
+        print(f"The percentage failed is {round(perc_fails, 1)}%")
+
+    # plot the distribution of the results of a single run
+    if len(runs) == 1 and not arguments.no_visualisation:
+        plt.hist(pd.read_csv(output).Costs, bins=20)
+        plt.show()
 
-    # plot the distribution of the results
-    plt.hist(results, bins=20)
-    plt.show()
 
-    # add the percentage of failure to the data and export
-    results.append(perc_fails)
-    df = pd.DataFrame(results, columns=["Costs"])
-    df.to_csv(f"Baseline_data/baseline{district}_{version}.csv")
+if __name__ == "__main__":
+    main()
@@ -3,48 +3,89 @@ This program runs smartgrid simulations depending on the users inpu
 """
 
 from __future__ import annotations
-import csv
+import argparse
+import itertools
 import json
-import copy
+import os
 import random
-from typing import Union, Any, Tuple, List
-from operator import attrgetter
+import shutil
+import sys
+from typing import Any, Dict, Final, Optional, Tuple, List
 import mesa
-import pandas as pd
 import numpy as np
-from Additional_code.simulated_annealing import optimization
-from Additional_code.distribute import distribute
+from Additional_code.simulated_annealing import optimization, export_chains
+from Additional_code.multi_start import multi_start
+from Additional_code.cooling import SCHEDULES
+from Additional_code.moves import MOVES
+from Additional_code.distribute import distribute, link_closest
 from Additional_code.place_battery import cluster_funct
+from Additional_code.profiling import Profiler
+from Additional_code.placement_search import search_placement
+from Additional_code.assignment import optimal_assignment
+from Additional_code.checkpoint import CHECKPOINT, load_checkpoint
+from Additional_code.steiner import STEINER_BUDGET, STEINER_ROUNDS
+from Additional_code.trace import TRACE, chains_path
+from Additional_code.tree_cache import TREE_CACHE_SIZE, TreeCache
 from Additional_code.visualisation import plot_annealing, visualisation
-from Additional_code.lay_cables import create_merged_path
+from Additional_code.district import (District, DistrictKey,
+                                      district_name, parse_district)
 from Agents.battery import Battery
 from Agents.house import House
 from Agents.cable import Cable
 
+# all versions that can be run
+VERSIONS: Final = ["1", "2", "advanced", "simulated annealing"]
+
+# ways to link the houses to the batteries before the optimization
+LINKINGS: Final = ["greedy", "exact"]
+
+# ways to place the batteries of the advanced version
+PLACEMENTS: Final = ["cluster", "search"]
+
+# default path of the json export
+OUTPUT: Final = "Smartgrid_data/smartgrid{district}_{version}.json"
+
 
 class SmartGrid(mesa.Model):
     """ A smartgrid situation"""
-    def __init__(self, district: int, version: str, iterations: int) -> None:
-        # objects
-        self.houses: List[House] = self.add_objects(district, 'houses')
-
+    def __init__(self, district: DistrictKey, version: str, iterations: int,
+                 schedule: str = 'geometric',
+                 linking: str = 'greedy',
+                 budget: float = STEINER_BUDGET,
+                 cache_size: int = TREE_CACHE_SIZE,
+                 placement: str = 'cluster',
+                 workers: Optional[int] = None,
+                 moves: Optional[List[str]] = None,
+                 steiner_rounds: Optional[int] = STEINER_ROUNDS,
+                 checkpoint: Optional[str] = None,
+                 checkpoint_every: int = 0,
+                 resume: bool = False,
+                 trace: Optional[str] = None,
+                 trace_every: int = 1,
+                 progress: Optional[str] = None,
+                 cprofile: bool = False,
+                 memory: bool = False) -> None:
         # which version we want to use
         self.version = version
         self.iterations = iterations
-
-        # whether we choose to do the advanced version of the code
-        if self.version == 'advanced':
-            # add own defined batteries
-            self.batteries = cluster_funct(self.houses)
-
-            # ! change the model to the Smartgrid model
-            for battery in self.batteries:
-                battery.model = self
-        else:
-            self.batteries: List[Battery] = self.add_objects(district,
-                                                             'batteries')
-
-        self.cables: List[Cable] = []
+        self.schedule = schedule
+        self.linking = linking
+        self.placement = placement
+        self.budget = budget
+        self.steiner_rounds = steiner_rounds
+        self.moves = moves
+
+        # path of the checkpoints, iterations between checkpoints and
+        # whether the optimization continues from the checkpoint
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.resume = resume
+
+        # path of the costs of the iterations, iterations between rows and
+        # path of the progress lines, '-' for the error output
+        self.trace = trace
+        self.trace_every = trace_every
+        self.progress = progress
 
         # the district which is chosen
         self.district = district
@@ -52,30 +93,155 @@ class SmartGrid(mesa.Model):
         # variable for representation
         self.information: List[dict[str, Any]] = []
 
-        # create the grid
-        self.create_grid()
+        # counts, acceptance rate and chance of every move of the
+        # optimization
+        self.move_statistics: dict[str, dict[str, float]] = {}
 
-        # order placement
-        self.placement_order()
+        # the agents are only created when the grid is needed
+        self._grid: Optional[mesa.space.MultiGrid] = None
 
-        # link houses
-        self.link_houses()
+        # timings of the stages and counters of the run
+        self.profiler = Profiler(cprofile, memory)
+        self.profiler.start()
+        try:
+            with self.profiler.stage("total"):
+                self.simulate(placement, workers, cache_size)
+        finally:
+            self.profiler.stop()
+
+    def simulate(self, placement: str, workers: Optional[int],
+                 cache_size: int) -> None:
+        """
+        This function runs all stages of the smartgrid: the district is
+        read, the batteries are placed for the advanced version, the houses
+        are linked and the cables are laid and optimized
+
+        Args:
+            placement (str): way to place the batteries, one of PLACEMENTS
+            workers (Optional[int]): processes to score battery placements
+            cache_size (int): number of merged cable trees to remember
+        """
+
+        stage = self.profiler.stage
+
+        # compact district with the houses and batteries
+        with stage("from_csv"):
+            self.core: District = District.from_csv(self.district)
+
+        # whether we choose to do the advanced version of the code
+        if self.version == 'advanced' and self.resumes():
+            # the batteries of the run that is continued
+            saved = load_checkpoint(self.checkpoint)
+            self.core = self.core.with_batteries(saved["battery_points"],
+                                                 saved["capacity"],
+                                                 saved["battery_costs"])
+        elif self.version == 'advanced':
+            # replace the batteries by own defined batteries
+            with stage("cluster_funct"):
+                self.core = cluster_funct(self.core)
+
+            # search the types, number and locations of the batteries
+            if placement == 'search':
+                with stage("search_placement"):
+                    self.core = search_placement(self.core, workers=workers)
+
+        # cache of the merged cable trees of the batteries
+        self.core.tree_cache = TreeCache(cache_size)
 
-        if version != "1":
-            # create copied model
-            self.copied_model: mesa.Model = copy.deepcopy(self)
+        # order placement
+        with stage("placement_order"):
+            self.placement_order()
 
-            # lay the cables
-            self.lay_cables_v2(self.batteries)
+        # link houses
+        with stage("link_houses"):
+            self.link_houses()
 
-            # optimize connections
-            self.optimization(iterations)
+        if self.version != "1":
+            # optimize connections and lay the cables
+            with stage("optimization"):
+                self.optimization(self.iterations)
         else:
             # lay cables via version 1
-            self.lay_cables_v1()
+            with stage("lay_cables_v1"):
+                self.lay_cables_v1()
 
         # get representation info
-        self.get_information()
+        with stage("get_information"):
+            self.get_information()
+
+    def report(self) -> Dict[str, Any]:
+        """
+        This function gives the timings of the stages, the counters of the
+        run and the functions that take the most time if profiled
+
+        Returns:
+            Dict[str, Any]: the report of the profiler with the merges of
+                the cable trees and the proposals of the moves as counters
+        """
+
+        report = self.profiler.report()
+        counters = report["counters"]
+
+        # work of the cache of the cable trees
+        cache = self.core.tree_cache
+        counters["merges"] = cache.misses
+        counters["cached_trees"] = cache.hits
+
+        # proposals of the optimization
+        for key in ["proposed", "failed", "accepted", "improved"]:
+            counters[f"moves_{key}"] = sum(int(statistics[key]) for statistics
+                                           in self.move_statistics.values())
+
+        return report
+
+    def resumes(self) -> bool:
+        """
+        This function checks whether the run continues from a checkpoint
+
+        Returns:
+            bool: True if resuming and the checkpoint exists
+        """
+
+        return (self.resume and self.checkpoint is not None and
+                os.path.exists(self.checkpoint))
+
+    def _ensure_grid(self) -> None:
+        """
+        This function creates the grid with the agents of the houses,
+        batteries and cables if it does not exist yet
+        """
+
+        if self._grid is None:
+            with self.profiler.stage("create_grid"):
+                self.create_grid()
+
+    @property
+    def grid(self) -> mesa.space.MultiGrid:
+        """
+        The grid with the agents of the houses, batteries and cables, which
+        are created the first time the grid is used
+        """
+
+        self._ensure_grid()
+        return self._grid
+
+    @property
+    def houses(self) -> List[House]:
+        """
+        The house agents in the order of the district
+        """
+
+        self._ensure_grid()
+        return self._houses
+
+    @property
+    def batteries(self) -> List[Battery]:
+        """
+        The battery agents in the order of the district
+        """
+
+        self._ensure_grid()
+        return self._batteries
 
     def bound(self) -> Tuple[int, int]:
         """
@@ -85,56 +251,72 @@ class SmartGrid(mesa.Model):
             tuple[int, int]: the maximum x and y values for the grid
         """
 
-        # find the maximum x and y values of the houses and battery lists
-        max_x: int = max([max(self.houses, key=attrgetter('x'))] +
-                         [max(self.batteries, key=attrgetter('x'))],
-                         key=attrgetter('x'))
-        max_y: int = max([max(self.houses, key=attrgetter('y'))] +
-                         [max(self.batteries, key=attrgetter('y'))],
-                         key=attrgetter('y'))
-
-        return (max_x.x, max_y.y)
+        return self.core.bound()
 
     def create_grid(self) -> None:
         """
-        This functions initialises the grid
+        This functions initialises the grid and creates the agents of the
+        houses, batteries and cables from the district
         """
 
+        core = self.core
         width, height = self.bound()
-        self.grid: mesa.space = mesa.space.MultiGrid(width + 1,
-                                                     height + 1, False)
+        self._grid = mesa.space.MultiGrid(width + 1, height + 1, False)
+        self.cables: List[Cable] = []
+
+        # create the houses and batteries
+        self._houses = [House(i + 1, self, int(x), int(y), float(energy))
+                        for i, (x, y, energy) in enumerate(zip(
+                            core.house_x, core.house_y, core.house_output))]
+        self._batteries = [Battery(i + 1, self, int(x), int(y),
+                                   float(capacity), int(costs))
+                           for i, (x, y, capacity, costs) in enumerate(zip(
+                               core.battery_x, core.battery_y,
+                               core.capacity, core.battery_costs))]
 
         # add houses to grid
-        for house in self.houses:
-            self.grid.place_agent(house, (house.x, house.y))
+        for house in self._houses:
+            self._grid.place_agent(house, (house.x, house.y))
+
+        # add batteries to grid and connect their houses
+        for battery, members in zip(self._batteries, core.members):
+            self._grid.place_agent(battery, (battery.x, battery.y))
+            for house in members:
+                battery.add_house(self._houses[house])
+
+        # create the cables
+        if core.shared:
+            for battery, path in zip(self._batteries, core.paths):
+                battery.all_paths = [path]
+                if path:
+                    battery.lay_cables()
+        else:
+            cable_id = 1000
+            for house, agent in enumerate(self._houses):
+                if core.assignment[house] < 0:
+                    continue
 
-        # add batteries to grid
-        for battery in self.batteries:
-            self.grid.place_agent(battery, (battery.x, battery.y))
+                for space in core.own_path(house):
+                    self.add_cable(space[0], space[1], agent, cable_id)
+                    cable_id += 1
 
-    def placement_order(self) -> None:
+    def placement_order(self, k: Optional[int] = None) -> None:
         """
         This function finds the order in which the houses get
         their battery assigned and sort the house list
-        """
 
-        for house in self.houses:
-            # list of distances to all the batteries
-            dist_batteries: List[int] = []
-
-            # find the distance for all the batteries
-            for battery in self.batteries:
-                # add distance to list
-                dist_batteries.append(house.distance(battery))
-
-            # sort the list in ascending order
-            dist_batteries.sort()
+        Args:
+            k (Optional[int]): the priority of a house is the distance to
+                its k-th closest battery minus the distance to its closest
+                battery, the furthest battery if None
+        """
 
-            # assign priority value to house
-            house.priority = dist_batteries[4] - dist_batteries[0]
+        # assign priority value to house
+        priority = self.core.regret(k)
 
         # * sort houses based on priority
-        self.houses.sort(key=lambda x: x.priority, reverse=True)
+        self.order: List[int] = np.argsort(-priority,
+                                           kind='stable').tolist()
 
     def link_houses(self) -> None:
         """
@@ -142,68 +324,50 @@ class SmartGrid(mesa.Model):
         and connects them.
         """
 
+        core = self.core
+        order = list(self.order)
+
         if self.version == 'simulated annealing':
-            random.shuffle(self.houses)
-
-        # all placed houses
-        houses_placed: List[House] = []
-
-        # find closest battery for every house
-        for house in self.houses:
-            # smallest distance to a battery
-            min_dist: int = -1
-
-            # boolean to check if the house can connect to a battery
-            battery_found: bool = False
-
-            if self.version != 'simulated annealing':
-                # check for all batteries
-                for battery in self.batteries:
-                    # distance to battery
-                    dist: int = house.distance(battery)
-
-                    # if a connection can be made, remember that
-                    if min_dist == -1 and house.check_connection(battery):
-                        min_dist = dist
-                        best_battery: Battery = battery
-                        battery_found = True
-                    # update if distance to new battery is smaller than minimum
-                    elif (min_dist > dist and
-                          house.check_connection(battery)):
-                        min_dist = dist
-                        best_battery: Battery = battery
-                        battery_found = True
-            else:
-                # pick a random battery order as destinations
-                sample: List[Battery] = random.sample(self.batteries,
-                                                      len(self.batteries))
+            random.shuffle(order)
+
+        # connect the houses with the smallest total distance if possible
+        if self.linking == 'exact':
+            assignment = optimal_assignment(core)
+            if assignment is not None:
+                for house in order:
+                    core.connect(house, int(assignment[house]))
+                return
+
+        # all houses which are not placed
+        houses_not_placed: List[int] = []
+
+        # the closest battery with enough capacity for every house
+        if self.version != 'simulated annealing':
+            houses_not_placed = link_closest(core, order)
+
+        # pick a random battery order as destinations
+        else:
+            for house in order:
+                sample: List[int] = random.sample(range(core.num_batteries),
+                                                  core.num_batteries)
 
                 # check each battery if suitable
                 for destination in sample:
                     # if the battery has enough space connect and break
-                    if house.check_connection(destination):
-                        destination.add_house(house)
-                        houses_placed.append(house)
+                    if core.fits(house, destination):
+                        core.connect(house, destination)
                         break
-
-            # add house to houses_placed if a battery is found
-            if battery_found:
-                # add house to battery and copy all the paths in battery
-                best_battery.add_house(house)
-                houses_placed.append(house)
-
-        # get all the houses which are not placed
-        houses_not_placed = [house for house in
-                             self.houses if house not in houses_placed]
+                else:
+                    houses_not_placed.append(house)
 
         # * shuffle houses such that unconnected houses are placed
         if len(houses_not_placed) > 0:
-            distribute(self.batteries, houses_not_placed)
+            with self.profiler.stage("distribute"):
+                houses_not_placed = distribute(core, houses_not_placed)
 
-        # * copy all paths of the battery to initialize if not version 1
-        if self.version != "1":
-            for battery in self.batteries:
-                battery.copy_all_paths()
+        if len(houses_not_placed) > 0:
+            raise ValueError(f"{len(houses_not_placed)} houses do not fit in "
+                             f"the batteries of district {self.district}")
 
     def lay_cables_v1(self) -> None:
         """
@@ -211,48 +375,7 @@ class SmartGrid(mesa.Model):
         batteries without connecting to houses
         """
 
-        # * initiate number of created cables
-        self.num_cables = 0
-
-        # initiate cable id's
-        cable_id = 1000
-
-        for house in self.houses:
-            # x and y coordinate of the connected battery
-            battery = house.connection
-
-            # create a path from the house to the battery
-            if battery.x >= house.x and battery.y <= house.y:
-                horizontal = [(i, house.y) for i in
-                              range(house.x, battery.x + 1, 1)]
-                vertical = [(battery.x, i) for i in
-                            np.arange(house.y, battery.y - 1, -1)]
-            elif battery.x >= house.x and battery.y >= house.y:
-                horizontal = [(i, house.y) for i in
-                              range(house.x, battery.x + 1, 1)]
-                vertical = [(battery.x, i) for i in
-                            range(house.y, battery.y + 1, 1)]
-            elif battery.x <= house.x and battery.y >= house.y:
-                horizontal = [(i, house.y) for i in
-                              np.arange(house.x, battery.x - 1, -1)]
-                vertical = [(battery.x, i) for i in
-                            range(house.y, battery.y + 1, 1)]
-            elif battery.x <= house.x and battery.y <= house.y:
-                horizontal = [(i, house.y) for i in
-                              np.arange(house.x, battery.x - 1, -1)]
-                vertical = [(battery.x, i) for i in
-                            np.arange(house.y, battery.y - 1, -1)]
-
-            path = horizontal + vertical
-
-            # remove the duplicate coordinates at turns
-            path = pd.unique(path).tolist()
-
-            # add cables in grid
-            for space in path:
-                # add cable to the house and place it
-                self.add_cable(space[0], space[1], house, cable_id)
-                cable_id += 1
+        self.core.lay_cables_v1()
 
     def add_cable(self, x: int, y: int, house: House, cable_id: int) -> None:
         """
@@ -267,52 +390,30 @@ class SmartGrid(mesa.Model):
         """
 
         # creates the cable
-        new_cable = Cable(cable_id, self, x, y, house.connection.unique_id)
+        new_cable = Cable(cable_id, x, y, house.connection.unique_id)
         new_cable.battery_connection = house.connection
         house.add_cable(new_cable)
 
-        # update number of cables
-        self.num_cables += 1
-
         # place cable in the grid
-        self.grid.place_agent(new_cable, (x, y))
+        self._grid.place_agent(new_cable, (x, y))
 
-    def lay_cables_v2(self, battery_list: List[Battery]) -> None:
+    def lay_cables_v2(self) -> None:
         """
         This functions places the cables to connect all houses to the
         batteries
         """
 
-        # * initiate global variable for the number of cables
-        self.num_cables: int = 0
-
-        # places all cables for all the houses on the batteries
-        for battery in self.batteries:
-            # keep mergen paths until 1 remains
-            while battery.get_len_paths() > 1:
-                create_merged_path(battery)
-
-            # if all paths are connected, draw all the cables
-            self.num_cables += battery.lay_cables()
-
-    def copy_optimize(self) -> None:
-        """
-        This function replaces self attributes with
-        copied_model attributes when called
-        """
-
-        self.houses = self.copied_model.houses
-        self.cables = self.copied_model.cables
-        self.batteries = self.copied_model.batteries
-        self.num_cables = self.copied_model.num_cables
-        self.grid = self.copied_model.grid
+        # merge all paths of every battery until 1 remains, or route a
+        # Steiner tree when that is shorter
+        with self.profiler.stage("lay_cables_v2"):
+            self.core.lay_cables_v2(self.budget, self.steiner_rounds)
 
     def optimization(self, iteration: int) -> None:
         """
         This function optimizes the battery allocations
         """
 
-        optimization(self, iteration)
+        optimization(self, iteration, self.schedule, self.moves)
 
     def costs(self) -> int:
         """
@@ -322,15 +423,7 @@ class SmartGrid(mesa.Model):
             int: total costs
         """
 
-        # calculate cable costs
-        cable_cost: int = self.num_cables * 9
-
-        # calculate battery costs
-        battery_cost: int = 0
-        for battery in self.batteries:
-            battery_cost += battery.costs
-
-        return cable_cost + battery_cost
+        return self.core.costs()
 
     def get_information(self) -> None:
         """
@@ -342,104 +435,28 @@ class SmartGrid(mesa.Model):
         dct["district"] = self.district
         dct["costs-shared"] = self.costs()
 
-        # add general information to information list
+        # add general information and the information of every battery
         self.information.append(dct)
+        self.information += self.core.information()
 
-        # for every battery make a dictionary with its information
-        for battery in self.batteries:
-            # dictionary of battery
-            dct = {}
-            dct["location"] = str(battery.x) + "," + str(battery.y)
-            dct["capacity"] = battery.capacity
-            dct["houses"] = []
-
-            # for every house make a dictionary with its information
-            for house in battery.houses:
-                # dictionary for house
-                dct_house: dict[str, Any] = {}
-                dct_house["location"] = str(house.x) + "," + str(house.y)
-                dct_house["output"] = house.energy
-                dct_house["cables"] = []
-
-                # add location of all cables connected to houses
-                # in the dictionary of information houses
-                for cable in house.cables:
-                    dct_house["cables"].append(str(cable.x)
-                                               + "," + str(cable.y))
-                dct["houses"].append(dct_house)
-
-            # add all information to self.information
-            self.information.append(dct)
-
-    def add_objects(self, district: int,
-                    info: str) -> Union[List[House], List[Battery]]:
-        """
-        Add houses or battery list of district depending on 'info'
-
-        Args:
-            district (int): district number
-            info (str): 'houses' or 'batteries'
-
-        Returns:
-            Union[list[House], list[Battery]]:
-                    a list with all the houses or batteries
-        """
-
-        # path to data
-        path = 'Huizen&Batterijen/district_' + str(district)
-        path += '/district-' + str(district) + '_' + info + '.csv'
-
-        # list with the information
-        lst = []
 
-        # add the information to the list
-        with open(path, 'r') as csv_file:
-            data = csv.reader(csv_file)
-
-            # index to skip header
-            count = 0
-
-            # go through all rows except the first
-            for line in data:
-                # skip header
-                if count == 0:
-                    count += 1
-                    continue
+def ask_arguments() -> argparse.Namespace:
+    """
+    This function asks the user for the settings of a single run
 
-                # convert the data to a neat list with floats
-                if not line[0].isnumeric():
-                    neat_data = line[0].split(',')
-                    line = neat_data + [line[1]]
+    Returns:
+        argparse.Namespace: the settings in the same format as the cli
+    """
 
-                # information
-                x = int(line[0])
-                y = int(line[1])
-                energy = float(line[2])
-
-                # append a house or Battery
-                if info == 'houses':
-                    lst.append(House(count, self, x, y, energy))
-                else:
-                    lst.append(Battery(count, self, x, y, energy, 5000))
-
-                count += 1
-
-        return lst
-
-
-if __name__ == "__main__":
     # asks for valid district
     district = input("Which district would you like to simulate? (1-3): ")
     while district not in ["1", "2", "3"]:
         district = input("Which district would you like to simulate? (1-3): ")
 
-    # convert district to integer
-    district = int(district)
-
     # ask for valid version
     print("Which version would you like to run?", end=" ")
     version = input("(1/2/advanced/simulated annealing): ")
-    while version not in ["1", "2", "advanced", "simulated annealing"]:
+    while version not in VERSIONS:
         print("Which version would you like to run?", end=" ")
         version = input("(1/2/advanced/simulated annealing): ")
 
@@ -450,22 +467,311 @@ if __name__ == "__main__":
         print("How many optimization iterations would you", end=" ")
         iterations = int(input("like to have (not useful for version 1): "))
 
-    # run smartgrid and print the costs
-    smartgrid = SmartGrid(district, version, iterations)
-    print(smartgrid.costs())
+    # asks for the cooling schedule and the number of parallel chains
+    schedule = 'geometric'
+    chains = 1
+    if version == 'simulated annealing':
+        options = "/".join(SCHEDULES)
+        print("Which cooling schedule would you like to use?", end=" ")
+        schedule = input(f"({options}): ")
+        while schedule not in SCHEDULES:
+            print("Which cooling schedule would you like to use?", end=" ")
+            schedule = input(f"({options}): ")
+
+        print("How many annealing chains would you like to", end=" ")
+        chains = int(input("run in parallel: "))
+        while chains < 1:
+            print("How many annealing chains would you like to", end=" ")
+            chains = int(input("run in parallel: "))
+
+    return argparse.Namespace(district=[int(district)], version=[version],
+                              iterations=[iterations], schedule=[schedule],
+                              seed=[None], chains=chains, output=OUTPUT,
+                              trace=TRACE, linking='greedy',
+                              budget=STEINER_BUDGET,
+                              steiner_rounds=STEINER_ROUNDS,
+                              cache_size=TREE_CACHE_SIZE,
+                              placement='cluster', workers=None,
+                              moves=None, checkpoint=CHECKPOINT,
+                              checkpoint_every=0, resume=False,
+                              trace_every=1, progress=None, profile=None,
+                              cprofile=False, tracemalloc=False,
+                              no_visualisation=False,
+                              interactive=True)
+
+
+def parse_arguments(argv: List[str]) -> argparse.Namespace:
+    """
+    This function parses the command line arguments. Every setting can get
+    several values, all combinations of them are run in this process.
+
+    Args:
+        argv (List[str]): the command line arguments
+
+    Returns:
+        argparse.Namespace: the settings
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Run smartgrid simulations. Giving several values for "
+                    "a setting runs all combinations in one process.")
+    parser.add_argument("-d", "--district", type=parse_district, nargs="+",
+                        required=True,
+                        help="district number(s) or folder(s) with a houses "
+                             "and a batteries csv file")
+    parser.add_argument("-v", "--version", nargs="+", default=["2"],
+                        choices=VERSIONS, help="version(s) to run")
+    parser.add_argument("-i", "--iterations", type=int, nargs="+",
+                        default=[0], help="optimization iterations")
+    parser.add_argument("-s", "--seed", type=int, nargs="+", default=[None],
+                        help="seed(s) of the random generator")
+    parser.add_argument("--schedule", nargs="+", default=["geometric"],
+                        choices=list(SCHEDULES),
+                        help="cooling schedule(s) of simulated annealing")
+    parser.add_argument("--linking", default="greedy", choices=LINKINGS,
+                        help="link the houses greedily to the closest "
+                             "battery, or with the smallest total distance "
+                             "with an integer program")
+    parser.add_argument("--budget", type=float, default=STEINER_BUDGET,
+                        help="most seconds to search a Steiner tree for "
+                             "the cables of every battery, a limit for very "
+                             "large batteries, 0 to only merge the paths")
+    parser.add_argument("--steiner-rounds", type=int, default=STEINER_ROUNDS,
+                        help="rounds to search a Steiner tree for the cables "
+                             "of every battery, 0 to only merge the paths")
+    parser.add_argument("--cache-size", type=int, default=TREE_CACHE_SIZE,
+                        help="number of merged cable trees to remember, 0 "
+                             "to merge every tree again")
+    parser.add_argument("--placement", default="cluster",
+                        choices=PLACEMENTS,
+                        help="place the batteries of the advanced version "
+                             "at the centres of clusters, or search their "
+                             "types, number and locations from there")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes to score battery placements, all "
+                             "cores by default")
+    parser.add_argument("--moves", nargs="+", default=None,
+                        choices=list(MOVES),
+                        help="moves of the optimization, all by default")
+    parser.add_argument("--chains", type=int, default=1,
+                        help="parallel chains of simulated annealing")
+    parser.add_argument("-o", "--output", default=OUTPUT,
+                        help="path of the json export, can use {district}, "
+                             "{version}, {iterations}, {seed} and "
+                             "{schedule}")
+    parser.add_argument("--trace", default=TRACE,
+                        help="path of the costs of simulated annealing, "
+                             "with the same fields as --output")
+    parser.add_argument("--trace-every", type=int, default=1,
+                        help="iterations between rows of the trace")
+    parser.add_argument("--progress", nargs="?", const="-", default=None,
+                        help="write the iterations per second and the costs "
+                             "every second to a file, or to the error "
+                             "output without a file")
+    parser.add_argument("--checkpoint", default=CHECKPOINT,
+                        help="path of the checkpoints of the optimization, "
+                             "with the same fields as --output")
+    parser.add_argument("--checkpoint-every", type=int, default=0,
+                        help="iterations between checkpoints, 0 to write "
+                             "no checkpoints")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the optimization from the checkpoint "
+                             "if it exists")
+    parser.add_argument("--profile", nargs="?", const="-", default=None,
+                        help="write the seconds of every stage and the "
+                             "counters of the run as json to a file, with "
+                             "the same fields as --output, or to the output "
+                             "without a file")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="add the functions that take the most time to "
+                             "the profile")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="add the peak memory of every stage to the "
+                             "profile")
+    parser.add_argument("--no-visualisation", action="store_true",
+                        help="do not show plots or the visualisation")
+
+    arguments = parser.parse_args(argv)
+    arguments.interactive = False
+
+    # parallel chains have no single line of progress
+    if ('simulated annealing' in arguments.version and
+            arguments.chains > 1 and arguments.progress is not None):
+        parser.error("--progress can not be used with more than 1 chain")
+
+    return arguments
+
+
+def run(district: DistrictKey, version: str, iterations: int, schedule: str,
+        seed: Optional[int], chains: int, output: str, trace: str,
+        linking: str = 'greedy',
+        budget: float = STEINER_BUDGET,
+        cache_size: int = TREE_CACHE_SIZE,
+        placement: str = 'cluster',
+        workers: Optional[int] = None,
+        moves: Optional[List[str]] = None,
+        steiner_rounds: Optional[int] = STEINER_ROUNDS,
+        checkpoint: Optional[str] = None,
+        checkpoint_every: int = 0,
+        resume: bool = False,
+        trace_every: int = 1,
+        progress: Optional[str] = None,
+        cprofile: bool = False,
+        memory: bool = False) -> SmartGrid:
+    """
+    This function runs a smartgrid simulation and exports the results
+
+    Args:
+        district (DistrictKey): district number or path
+        version (str): version of the algorithm
+        iterations (int): number of optimization iterations
+        schedule (str): cooling schedule of simulated annealing
+        seed (Optional[int]): seed of the random generator, random if None
+        chains (int): number of parallel chains of simulated annealing
+        output (str): path of the json export
+        trace (str): path of the costs of simulated annealing
+        linking (str): way to link the houses, one of LINKINGS
+        budget (float): most seconds to search a Steiner tree per battery
+        cache_size (int): number of merged cable trees to remember
+        placement (str): way to place the batteries, one of PLACEMENTS
+        workers (Optional[int]): processes to score battery placements
+        moves (Optional[List[str]]): moves of the optimization, all if None
+        steiner_rounds (Optional[int]): rounds to search a Steiner tree per
+            battery, no limit if None
+        checkpoint (Optional[str]): path of the checkpoints
+        checkpoint_every (int): iterations between checkpoints, 0 for none
+        resume (bool): whether to continue from the checkpoint
+        trace_every (int): iterations between rows of the trace
+        progress (Optional[str]): path of the progress lines, '-' for the
+            error output
+        cprofile (bool): whether to profile the functions with cProfile
+        memory (bool): whether to measure the peak memory of the stages
+
+    Returns:
+        SmartGrid: the simulated smartgrid
+    """
+
+    if version == 'simulated annealing' and chains > 1 and \
+            progress is not None:
+        raise ValueError("progress can not be reported for more than 1 "
+                         "chain")
+
+    if seed is not None:
+        random.seed(seed)
+
+    # run smartgrid, the costs of simulated annealing are streamed to trace
+    if version == 'simulated annealing' and chains > 1:
+        smartgrid, traces = multi_start(SmartGrid, district, iterations,
+                                        chains, seed=seed, schedule=schedule,
+                                        linking=linking, budget=budget,
+                                        cache_size=cache_size, moves=moves,
+                                        steiner_rounds=steiner_rounds,
+                                        trace=trace, trace_every=trace_every,
+                                        cprofile=cprofile, memory=memory)
+
+        # keep the trace of the best chain and join all traces
+        shutil.copyfile(smartgrid.trace, trace)
+        export_chains(traces, chains_path(trace))
+        for chain_trace in traces:
+            os.remove(chain_trace)
+    else:
+        # only simulated annealing streams its costs
+        if version != 'simulated annealing':
+            trace = None
+        smartgrid = SmartGrid(district, version, iterations,
+                              schedule=schedule, linking=linking,
+                              budget=budget, cache_size=cache_size,
+                              placement=placement, workers=workers,
+                              moves=moves, steiner_rounds=steiner_rounds,
+                              checkpoint=checkpoint,
+                              checkpoint_every=checkpoint_every,
+                              resume=resume, trace=trace,
+                              trace_every=trace_every, progress=progress,
+                              cprofile=cprofile, memory=memory)
 
     # export smartgrid information
-    with open(f"Smartgrid_data/smartgrid{district}_{version}.json",
-              "w") as outfile:
+    with open(output, "w") as outfile:
         json.dump(smartgrid.information, outfile)
 
+    return smartgrid
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    This function runs smartgrid with the command line arguments, or asks
+    for the settings when there are none
+
+    Args:
+        argv (Optional[List[str]]): the command line arguments
+    """
+
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv:
+        arguments = parse_arguments(argv)
+    else:
+        arguments = ask_arguments()
+
+    # all combinations of the settings
+    runs = list(itertools.product(arguments.district, arguments.version,
+                                  arguments.iterations, arguments.schedule,
+                                  arguments.seed))
+
+    for district, version, iterations, schedule, seed in runs:
+        fields = {"district": district_name(district), "version": version,
+                  "iterations": iterations, "schedule": schedule,
+                  "seed": seed}
+        smartgrid = run(district, version, iterations, schedule, seed,
+                        chains=arguments.chains,
+                        output=arguments.output.format(**fields),
+                        trace=arguments.trace.format(**fields),
+                        linking=arguments.linking,
+                        budget=arguments.budget,
+                        cache_size=arguments.cache_size,
+                        placement=arguments.placement,
+                        workers=arguments.workers,
+                        moves=arguments.moves,
+                        steiner_rounds=arguments.steiner_rounds,
+                        checkpoint=arguments.checkpoint.format(**fields),
+                        checkpoint_every=arguments.checkpoint_every,
+                        resume=arguments.resume,
+                        trace_every=arguments.trace_every,
+                        progress=arguments.progress,
+                        cprofile=arguments.cprofile,
+                        memory=arguments.tracemalloc)
+
+        # print the costs
+        if len(runs) > 1:
+            print(", ".join(f"{key}={value}" for key, value
+                            in fields.items()), end=": ")
+        print(smartgrid.costs())
+
+        # the timings of the stages and the counters of the run
+        if arguments.profile == "-":
+            print(json.dumps(smartgrid.report(), indent=2))
+        elif arguments.profile is not None:
+            with open(arguments.profile.format(**fields), "w") as outfile:
+                json.dump(smartgrid.report(), outfile, indent=2)
+
+    # only show the results of a single run
+    if len(runs) > 1 or arguments.no_visualisation:
+        return
+
     if version == 'simulated annealing':
-        plot_annealing()
+        plot_annealing(arguments.trace.format(**fields))
 
     # asks for valid input request visualisation
-    vis = input('Do you want a visualisation (Y/N): ')
-    while vis not in ['Y', 'N']:
+    if arguments.interactive:
         vis = input('Do you want a visualisation (Y/N): ')
+        while vis not in ['Y', 'N']:
+            vis = input('Do you want a visualisation (Y/N): ')
+    else:
+        vis = 'Y'
 
     if vis == 'Y':
         visualisation(smartgrid, SmartGrid)
+
+
+if __name__ == "__main__":
+    main()
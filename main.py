@@ -1,43 +1,60 @@
 """
-This program will launch smartgrid simulations or the baseline
+This program will launch smartgrid simulations or the baseline. The
+program can be given as first argument, the other arguments are passed on:
+
+    python main.py smartgrid --district 1 --version 2 --iterations 100
 """
 
 import os
+import sys
 from typing import Final
 
+# the programs are in the Code folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "Code"))
+
 # options which kind of programs can be runned
 OPTIONS: Final = ["smartgrid", "baseline"]
 
 if __name__ == "__main__":
-    # give user the choices of programs
-    print("What would you like to run? The options are:")
-    for program in OPTIONS:
-        if program == OPTIONS[-1]:
-            print(program)
-        else:
-            print(f"{program}, ", end=" ")
-
-    # ask user for which program to run
-    run = input()
-
-    # keep asking until valid input
-    while run not in OPTIONS:
-        print("Enter a valid option. The options are:")
+    if len(sys.argv) > 1:
+        # the program and its arguments are given
+        run = sys.argv[1]
+        arguments = sys.argv[2:]
+
+        if run not in OPTIONS:
+            sys.exit(f"Unknown program {run}, choose from {OPTIONS}")
+    else:
+        # give user the choices of programs
+        print("What would you like to run? The options are:")
         for program in OPTIONS:
             if program == OPTIONS[-1]:
                 print(program)
             else:
                 print(f"{program}, ", end=" ")
 
+        # ask user for which program to run
         run = input()
 
-    # clear terminal
-    os.system('clear')
+        # keep asking until valid input
+        while run not in OPTIONS:
+            print("Enter a valid option. The options are:")
+            for program in OPTIONS:
+                if program == OPTIONS[-1]:
+                    print(program)
+                else:
+                    print(f"{program}, ", end=" ")
 
-    # clear terminal and run the given program
-    if run == 'baseline':
+            run = input()
+
+        # clear terminal
         os.system('clear')
-        os.system('python3 Code/baseline.py')
+        arguments = []
+
+    # run the given program in this process
+    if run == 'baseline':
+        import baseline
+        baseline.main(arguments)
     else:
-        os.system('clear')
-        os.system('python3 Code/smartgrid.py')
+        import smartgrid
+        smartgrid.main(arguments)